@@ -0,0 +1,251 @@
+"""BATCH SUDOKU SOLVER
+
+Solves large numbers of Sudoku puzzles on all CPU cores. Puzzles are given as lines of 81
+characters (row by row, '0' or '.' for an empty cell) and are sent to a pool of worker
+processes in chunks. Results are returned in the order of the input, with a status for every
+puzzle, so a single bad puzzle does not stop the batch.
+
+Usage:
+    python batch.py puzzles.txt -o solutions.csv --solver dlx --workers 8
+
+"""
+
+import argparse
+import collections
+import csv
+import itertools
+import os
+import sys
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import sudoku
+from sudoku_io import format_grid, iter_lines, parse_line
+
+# status values of a PuzzleResult, SOLVED, UNSOLVABLE and LIMIT as in a sudoku.SolveResult
+SOLVED = sudoku.SOLVED
+UNSOLVABLE = sudoku.UNSOLVABLE
+INVALID = 'invalid'
+LIMIT = sudoku.LIMIT
+ERROR = 'error'
+
+PuzzleResult = collections.namedtuple('PuzzleResult', ['puzzle', 'status', 'solution', 'error'])
+PuzzleResult.__doc__ = """Outcome of solving one puzzle of a batch.
+
+puzzle (String): the puzzle as given in the input
+status (String): one of SOLVED, UNSOLVABLE, INVALID, LIMIT or ERROR
+solution (String): the solution as 81 digits (in line format for other sizes), or None if the
+puzzle was not solved
+error (String): description of the problem if the status is INVALID, LIMIT or ERROR
+"""
+
+
+def solve_puzzle(line, solver='backtrack', max_nodes=None, timeout=None):
+    """Solves a single puzzle given as a line of 81 characters, without printing anything.
+
+    Returns:
+        PuzzleResult: the outcome for the puzzle
+    """
+    try:
+        puzzle = parse_line(line)
+    except ValueError as exception:
+        return PuzzleResult(line, INVALID, None, str(exception))
+    return solve_board(line, puzzle, solver, max_nodes, timeout)
+
+
+def solve_board(line, puzzle, solver='backtrack', max_nodes=None, timeout=None):
+    """Solves an already loaded puzzle, without printing anything.
+
+    Args:
+        line (String): the puzzle as given in the input, reported back in the result
+        puzzle (Sudoku): the loaded puzzle
+        solver (String, optional): 'backtrack' or 'dlx'. Defaults to 'backtrack'.
+        max_nodes (int, optional): node limit. Defaults to None (no limit).
+        timeout (float, optional): time limit in seconds. Defaults to None (no limit).
+
+    Returns:
+        PuzzleResult: the outcome for the puzzle
+    """
+    try:
+        if solver == 'dlx':
+            from dlx import solve_exact_cover
+            grid = solve_exact_cover(puzzle, max_nodes=max_nodes, timeout=timeout)
+            solution = None if grid is None else [value for row in grid for value in row]
+        elif solver == 'backtrack':
+            solution = None
+            for solved in puzzle.search(max_nodes=max_nodes, timeout=timeout):
+                solution = solved.grid
+                break
+        else:
+            raise ValueError(f"solver \'{solver}\' can not be used for batches")
+    except sudoku.SearchLimitReached as exception:
+        return PuzzleResult(line, LIMIT, None, str(exception))
+    except Exception as exception:  # report the failure and carry on with the batch
+        return PuzzleResult(line, ERROR, None, f"{type(exception).__name__}: {exception}")
+    if solution is None:
+        return PuzzleResult(line, UNSOLVABLE, None, None)
+    return PuzzleResult(line, SOLVED, format_grid(solution), None)
+
+
+def _solve_chunk(lines, solver, max_nodes, timeout, lockstep):
+    """Worker process entry point: solves a chunk of puzzles."""
+    if lockstep:
+        from vectorized import solve_lines
+        return solve_lines(lines, solver, max_nodes, timeout)
+    return [solve_puzzle(line, solver, max_nodes, timeout) for line in lines]
+
+
+def _is_lost(future):
+    """Checks if a chunk has to be sent again after its pool broke down."""
+    return (not future.done() or future.cancelled()
+            or isinstance(future.exception(), BrokenProcessPool))
+
+
+def _solve_alone(lines, solver, max_nodes, timeout, lockstep):
+    """Solves the puzzles of a chunk that was lost twice one at a time on a separate worker
+    process, so that only a puzzle that crashes the worker itself gets the status ERROR.
+
+    Yields:
+        PuzzleResult: the outcome for each puzzle, in input order
+    """
+    pool = ProcessPoolExecutor(max_workers=1)
+    try:
+        for line in lines:
+            try:
+                yield from pool.submit(_solve_chunk, [line], solver, max_nodes, timeout,
+                                       lockstep).result()
+            except BrokenProcessPool as exception:
+                pool.shutdown(wait=False)
+                pool = ProcessPoolExecutor(max_workers=1)
+                yield PuzzleResult(line, ERROR, None, f"{type(exception).__name__}: {exception}")
+    finally:
+        pool.shutdown()
+
+
+def solve_many(puzzles, solver='backtrack', workers=None, chunk_size=64, max_nodes=None,
+               timeout=None, lockstep=False):
+    """Solves an iterable of puzzles on a pool of worker processes.
+
+    The puzzles are read lazily and submitted in chunks, with a bounded number of chunks in
+    flight, so the input can be far larger than memory. Results are yielded in input order.
+
+    If a worker process dies, the pool is replaced and the chunks that were in flight are sent
+    again. A chunk that is lost twice is solved one puzzle at a time on a separate worker, so
+    only the puzzle that crashes the worker gets the status ERROR.
+
+    Args:
+        puzzles (iterable of String): puzzles as lines of 81 characters
+        solver (String, optional): 'backtrack' or 'dlx'. Defaults to 'backtrack'.
+        workers (int, optional): number of worker processes. Defaults to None (one per CPU).
+        A value of 1 solves the puzzles in the current process.
+        chunk_size (int, optional): number of puzzles sent to a worker at once. Defaults to 64.
+        max_nodes (int, optional): node limit per puzzle. Defaults to None (no limit).
+        timeout (float, optional): time limit in seconds per puzzle. Defaults to None
+        (no limit).
+        lockstep (bool, optional): resolve the singles of each chunk in lockstep with NumPy
+        (see vectorized.py) and search only the puzzles that are still open. Defaults to False.
+
+    Yields:
+        PuzzleResult: the outcome for each puzzle, in input order
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    lines = iter(puzzles)
+    chunks = iter(lambda: list(itertools.islice(lines, chunk_size)), [])
+    if workers <= 1:
+        for chunk in chunks:
+            yield from _solve_chunk(chunk, solver, max_nodes, timeout, lockstep)
+        return
+
+    # chunks in flight as [chunk, future, pool, attempts], in input order
+    pending = collections.deque()
+    pool = ProcessPoolExecutor(max_workers=workers)
+
+    def submit(chunk, attempts=0):
+        try:
+            future = pool.submit(_solve_chunk, chunk, solver, max_nodes, timeout, lockstep)
+        except BrokenProcessPool as exception:
+            # handled like a chunk that was in flight when the pool broke
+            future = Future()
+            future.set_exception(exception)
+        return [chunk, future, pool, attempts]
+
+    try:
+        for chunk in itertools.islice(chunks, 2 * workers):
+            pending.append(submit(chunk))
+        while pending:
+            chunk, future, chunk_pool, attempts = pending[0]
+            try:
+                results = future.result()
+            except BrokenProcessPool as exception:
+                # A worker process died and took all chunks in flight with it. They are sent
+                # to a new pool; a chunk that is lost a second time may well hold the puzzle
+                # that crashes the worker, so its puzzles are solved one at a time.
+                if chunk_pool is pool:
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    pool = ProcessPoolExecutor(max_workers=workers)
+                    for position in range(len(pending)):
+                        lost, lost_future, _, lost_attempts = pending[position]
+                        if _is_lost(lost_future) and (position > 0 or lost_attempts == 0):
+                            pending[position] = submit(lost, lost_attempts + 1)
+                    if pending[0][1] is not future:
+                        continue
+                results = _solve_alone(chunk, solver, max_nodes, timeout, lockstep)
+            except Exception as exception:
+                message = f"{type(exception).__name__}: {exception}"
+                results = [PuzzleResult(line, ERROR, None, message) for line in chunk]
+            pending.popleft()
+            yield from results
+            for next_chunk in itertools.islice(chunks, 1):
+                pending.append(submit(next_chunk))
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+
+def main(argv=None):
+    """Command line interface, see the module docstring."""
+    parser = argparse.ArgumentParser(description="Solve a file with one Sudoku puzzle per line.")
+    parser.add_argument('input', help="file with one puzzle of 81 characters per line, "
+                        "'-' for standard input, gzip compressed if it ends in .gz")
+    parser.add_argument('--mmap', action='store_true', help="memory-map the input file")
+    parser.add_argument('-o', '--output', default='-',
+                        help="csv file for the results, '-' (default) for standard output")
+    parser.add_argument('--solver', choices=['backtrack', 'dlx'], default='backtrack')
+    parser.add_argument('--workers', type=int, default=None,
+                        help="number of worker processes (default: one per CPU)")
+    parser.add_argument('--chunk-size', type=int, default=64)
+    parser.add_argument('--lockstep', action='store_true',
+                        help="resolve singles of each chunk in lockstep with NumPy")
+    parser.add_argument('--max-nodes', type=int, default=None)
+    parser.add_argument('--timeout', type=float, default=None,
+                        help="time limit in seconds per puzzle")
+    args = parser.parse_args(argv)
+
+    output_file = sys.stdout if args.output == '-' else open(args.output, 'w', newline='')
+    start_time = time.time()
+    counts = collections.Counter()
+    try:
+        writer = csv.writer(output_file)
+        writer.writerow(PuzzleResult._fields)
+        for result in solve_many(iter_lines(args.input, args.mmap), solver=args.solver,
+                                 workers=args.workers, chunk_size=args.chunk_size,
+                                 max_nodes=args.max_nodes, timeout=args.timeout,
+                                 lockstep=args.lockstep):
+            writer.writerow(result)
+            counts[result.status] += 1
+    finally:
+        if output_file is not sys.stdout:
+            output_file.close()
+
+    summary = ', '.join(f"{count} {status}" for status, count in sorted(counts.items()))
+    print(f"{sum(counts.values())} puzzles ({summary}) in {time.time() - start_time:.2f} seconds",
+          file=sys.stderr)
+    return 0 if counts[ERROR] == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
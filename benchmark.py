@@ -0,0 +1,260 @@
+"""SUDOKU BENCHMARK
+
+Runs the solver backends over the bundled sudoku_*.csv puzzles and a generated corpus, and
+reports per puzzle and solver the wall time (after warmup, over repeated runs), the number of
+search nodes and propagation steps and the peak memory use.
+
+The generated corpus consists of random but reproducible (seeded) variants of the bundled
+puzzles: digits are relabeled and rows, columns, bands and stacks are permuted, which keeps
+the difficulty of a puzzle the same.
+
+The naive solver takes minutes on the 17-hint puzzles, so it only runs when asked for with
+'--solvers backtrack dlx naive'. A combination whose first run already exceeds the time
+budget is run only once: that run is timed and no warmup or memory run follows.
+
+Results are written as JSON or csv. A previous JSON report can be passed with --compare to
+check for performance regressions between releases.
+
+Usage:
+    python benchmark.py -o report.json
+    python benchmark.py --compare report.json --threshold 1.25
+
+"""
+
+import argparse
+import csv
+import glob
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+import sudoku
+from generator import random_variant
+
+FIELDS = ['puzzle', 'source', 'solver', 'solved', 'repeats', 'wall_min', 'wall_median',
+          'wall_mean', 'nodes', 'propagations', 'peak_memory_kib']
+
+# the naive solver takes minutes per 17-hint puzzle and is only run on request
+DEFAULT_SOLVERS = tuple(solver for solver in sudoku.SOLVERS if solver != 'naive')
+
+
+def bundled_puzzles(directory=None):
+    """Returns the bundled puzzles as a list of (name, grid) tuples, with the grid as a flat list
+    of 81 values.
+    """
+    directory = directory or os.path.dirname(os.path.abspath(__file__))
+    puzzles = []
+    for file_name in sorted(glob.glob(os.path.join(directory, 'sudoku_*.csv'))):
+        puzzle = sudoku.Sudoku(file_name=file_name)
+        puzzles.append((os.path.basename(file_name), puzzle.grid[:]))
+    return puzzles
+
+
+def generated_puzzles(puzzles, count, seed):
+    """Returns count random variants of the given (name, grid) puzzles, generated with the
+    given seed. Completed and (nearly) empty grids are left out as a source.
+    """
+    rng = random.Random(seed)
+    sources = [(name, grid) for name, grid in puzzles if 17 <= 81 - grid.count(0) < 81]
+    generated = []
+    for number in range(count):
+        name, grid = sources[number % len(sources)]
+        generated.append((f"{name}#{number}", random_variant(grid, rng)))
+    return generated
+
+
+def _run(grid, solver):
+    """Solves a fresh copy of the puzzle and returns the puzzle, the result and the seconds
+    the solver took.
+    """
+    puzzle = sudoku.Sudoku.from_grid(grid)
+    start = time.perf_counter()
+    solved = puzzle.solve(solver=solver, verbose=False)
+    return puzzle, solved, time.perf_counter() - start
+
+
+def measure(grid, solver, repeats=5, warmup=1, budget=2.0):
+    """Benchmarks one solver on one puzzle.
+
+    Args:
+        grid (list of int): the puzzle as a flat list of 81 values
+        solver (String): name of the solver backend, see sudoku.SOLVERS
+        repeats (int, optional): number of timed runs. Defaults to 5.
+        warmup (int, optional): number of untimed runs before the timed runs. Defaults to 1.
+        budget (float, optional): seconds after which no further timed runs are started.
+        A single run that takes longer (e.g. the naive solver on 17-hint puzzles) is the only
+        run: a slow warmup run counts as the timed run and the memory run is skipped.
+        Defaults to 2.0.
+
+    Returns:
+        dict: the measurements, with the keys of FIELDS except 'puzzle' and 'source'.
+        'peak_memory_kib' is None if the memory run was skipped.
+    """
+    times = []
+    for _ in range(warmup):
+        puzzle, solved, seconds = _run(grid, solver)
+        if seconds >= budget:
+            times.append(seconds)
+            break
+
+    while len(times) < repeats and sum(times) < budget:
+        puzzle, solved, seconds = _run(grid, solver)
+        times.append(seconds)
+
+    peak = None
+    if max(times) < budget:
+        # memory is measured in a separate run, tracing slows down the solver
+        tracemalloc.start()
+        try:
+            _run(grid, solver)
+            peak = tracemalloc.get_traced_memory()[1] / 1024
+        finally:
+            tracemalloc.stop()
+
+    counted = solver != 'naive'  # alternative_solve() does not count its work
+    return {
+        'solver': solver,
+        'solved': solved,
+        'repeats': len(times),
+        'wall_min': min(times),
+        'wall_median': statistics.median(times),
+        'wall_mean': statistics.fmean(times),
+        'nodes': puzzle.stats.nodes if counted else None,
+        'propagations': puzzle.stats.propagations if counted else None,
+        'peak_memory_kib': peak,
+    }
+
+
+def run_benchmark(solvers=DEFAULT_SOLVERS, generated=20, seed=0, repeats=5, warmup=1,
+                  budget=2.0, progress=None):
+    """Runs all solvers over the bundled puzzles and a generated corpus.
+
+    Args:
+        solvers (sequence of String, optional): solver backends. Defaults to
+        DEFAULT_SOLVERS, i.e. all but the naive solver.
+        generated (int, optional): size of the generated corpus. Defaults to 20.
+        seed (int, optional): seed of the generated corpus. Defaults to 0.
+        repeats (int, optional): number of timed runs per puzzle and solver. Defaults to 5.
+        warmup (int, optional): number of untimed runs first. Defaults to 1.
+        budget (float, optional): time budget in seconds for the timed runs of one puzzle and
+        solver, see measure(). Defaults to 2.0.
+        progress (callable, optional): called with every result as it is ready.
+
+    Returns:
+        dict: report with the keys 'environment' and 'results'
+    """
+    bundled = bundled_puzzles()
+    corpus = ([(name, 'bundled', grid) for name, grid in bundled]
+              + [(name, 'generated', grid)
+                 for name, grid in generated_puzzles(bundled, generated, seed)])
+    results = []
+    for name, source, grid in corpus:
+        for solver in solvers:
+            result = {'puzzle': name, 'source': source}
+            result.update(measure(grid, solver, repeats, warmup, budget))
+            results.append(result)
+            if progress is not None:
+                progress(result)
+    environment = {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'seed': seed,
+        'generated': generated,
+        'repeats': repeats,
+        'warmup': warmup,
+        'budget': budget,
+    }
+    return {'environment': environment, 'results': results}
+
+
+def compare(report, baseline, threshold=1.25):
+    """Compares the median wall times of a report with those of a baseline report.
+
+    Args:
+        report (dict): the new report
+        baseline (dict): the baseline report
+        threshold (float, optional): ratio new / baseline above which a result counts as a
+        regression. Defaults to 1.25.
+
+    Returns:
+        list of tuple: (puzzle, solver, baseline seconds, new seconds, ratio) for every
+        regression
+    """
+    previous = {(result['puzzle'], result['solver']): result['wall_median']
+                for result in baseline['results']}
+    regressions = []
+    for result in report['results']:
+        key = (result['puzzle'], result['solver'])
+        if key in previous and previous[key] > 0:
+            ratio = result['wall_median'] / previous[key]
+            if ratio > threshold:
+                regressions.append(key + (previous[key], result['wall_median'], ratio))
+    return regressions
+
+
+def write_report(report, file, output_format):
+    """Writes a report as 'json' or 'csv' to an open file."""
+    if output_format == 'json':
+        json.dump(report, file, indent=2)
+        file.write('\n')
+    else:
+        writer = csv.DictWriter(file, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(report['results'])
+
+
+def main(argv=None):
+    """Command line interface, see the module docstring."""
+    parser = argparse.ArgumentParser(description="Benchmark the Sudoku solver backends.")
+    parser.add_argument('-o', '--output', default='-',
+                        help="report file, '-' (default) for standard output")
+    parser.add_argument('--format', choices=['json', 'csv'], default=None,
+                        help="report format (default: from the file extension, else json)")
+    parser.add_argument('--solvers', nargs='+', choices=sudoku.SOLVERS,
+                        default=DEFAULT_SOLVERS,
+                        help="solver backends (default: backtrack dlx; naive is slow)")
+    parser.add_argument('--generated', type=int, default=20,
+                        help="number of generated puzzles (default: 20)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--budget', type=float, default=2.0,
+                        help="seconds of timed runs per puzzle and solver (default: 2.0)")
+    parser.add_argument('--compare', metavar='BASELINE',
+                        help="JSON report of an earlier run to check for regressions")
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help="slowdown ratio that counts as a regression (default: 1.25)")
+    args = parser.parse_args(argv)
+
+    def progress(result):
+        print(f"{result['puzzle']:28s} {result['solver']:10s} "
+              f"{result['wall_median'] * 1000:10.2f} ms", file=sys.stderr)
+
+    report = run_benchmark(args.solvers, args.generated, args.seed, args.repeats, args.warmup,
+                           args.budget, progress)
+    output_format = args.format or ('csv' if args.output.endswith('.csv') else 'json')
+    if args.output == '-':
+        write_report(report, sys.stdout, output_format)
+    else:
+        with open(args.output, 'w', newline='') as file:
+            write_report(report, file, output_format)
+
+    if args.compare:
+        with open(args.compare, 'r') as file:
+            regressions = compare(report, json.load(file), args.threshold)
+        for puzzle, solver, before, after, ratio in regressions:
+            print(f"REGRESSION {puzzle} {solver}: {before * 1000:.2f} ms -> "
+                  f"{after * 1000:.2f} ms ({ratio:.2f}x)", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
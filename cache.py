@@ -0,0 +1,456 @@
+"""Solution cache keyed by the canonical form of a puzzle.
+
+Two puzzles are equivalent when one can be turned into the other by relabeling the digits,
+permuting the rows within a band, the columns within a stack, the bands and the stacks, and
+transposing the grid. Such puzzles have equivalent solutions and the same difficulty, so a
+solution only has to be computed once for all of them.
+
+canonical_form() returns a representative that is the same for all equivalent puzzles,
+together with the transformation that produces it. Invariants of the rows and columns (clue
+counts, digit frequencies) fix most of the transformation, so a typical puzzle is
+canonicalized in about 0.3 milliseconds, less than solving it takes unless it is easy; only
+puzzles with many symmetries, such as a single filled band, need tens of milliseconds.
+
+SolutionCache stores solutions by canonical puzzle in a bounded LRU, optionally backed by a
+dbm file on disk, and transforms a cached solution back to the orientation of the caller on a
+hit. Puzzles that were seen before in exactly the same form are found through a raw lookup
+first, without canonicalizing them.
+"""
+
+import collections
+import dbm
+import itertools
+
+from batch import INVALID, SOLVED, PuzzleResult, solve_puzzle
+from sudoku import UNITS, Sudoku
+from sudoku_io import check_line
+
+Transform = collections.namedtuple('Transform', ['transpose', 'rows', 'cols', 'labels'])
+Transform.__doc__ = """A transformation of a puzzle into an equivalent puzzle, see transform().
+
+transpose (bool): transpose the grid first
+rows (tuple of int): for each row of the result the row of the (transposed) grid it comes from
+cols (tuple of int): for each column of the result the column it comes from
+labels (tuple of int): the new digit for each digit 0 to 9 (0 stays 0)
+"""
+
+# key of an empty row or column, see _line_keys(); it is smaller than the key of any other line
+_EMPTY_KEY = ((0,) * 9, (), ())
+
+
+def _as_grid(puzzle):
+    """Returns the flat list of 81 values of a Sudoku, a puzzle line or a flat list.
+
+    A value given twice in a row, column or box is rejected here: such a puzzle has no
+    solution to cache, and its many equal rows would make canonical_form() try a vast number
+    of transformations.
+    """
+    if isinstance(puzzle, Sudoku):
+        grid = puzzle.grid[:]
+    elif isinstance(puzzle, str):
+        line = check_line(puzzle)
+        if len(line) != 81:
+            raise ValueError("only 9 x 9 puzzles can be cached")
+        grid = [int(char) for char in line.replace('.', '0')]
+    else:
+        grid = list(puzzle)
+        if not all(type(value) is int and 0 <= value <= 9 for value in grid):
+            raise ValueError("a puzzle must have the values 0 to 9")
+    if len(grid) != 81:
+        raise ValueError("only 9 x 9 puzzles can be cached")
+    for unit in UNITS:
+        values = [grid[index] for index in unit if grid[index]]
+        if len(set(values)) != len(values):
+            raise ValueError("a value occurs twice in a row, column or box")
+    return grid
+
+
+def _line_keys(grid):
+    """Returns the keys of the rows and of the columns of a puzzle: invariants that do not change
+    when the digits are relabeled or the rows and columns are permuted.
+
+    The weight of a cell is the number of times its digit occurs in the puzzle (0 for an empty
+    cell). The key of a row holds the sorted weights of its cells, for every filled cell the
+    weight together with the rank of the sorted weights of the column of the cell, and the
+    cycle types of a full row (see _cycle_types()); the key of a column is built the same way.
+    """
+    counts = [0] + [grid.count(value) for value in range(1, 10)]
+    weights = [counts[value] for value in grid]
+    rows = [weights[row * 9:row * 9 + 9] for row in range(9)]
+    cols = [weights[col::9] for col in range(9)]
+    row_weights = [tuple(sorted(row)) for row in rows]
+    col_weights = [tuple(sorted(col)) for col in cols]
+    ranks = {key: rank for rank, key in enumerate(sorted(set(row_weights)))}
+    row_ranks = [ranks[key] for key in row_weights]
+    ranks = {key: rank for rank, key in enumerate(sorted(set(col_weights)))}
+    col_ranks = [ranks[key] for key in col_weights]
+    row_cycles = _cycle_types([grid[row * 9:row * 9 + 9] for row in range(9)])
+    col_cycles = _cycle_types([grid[col::9] for col in range(9)])
+    row_keys = [(row_weights[row],
+                 tuple(sorted([weight * 16 + col_ranks[col]
+                               for col, weight in enumerate(rows[row]) if weight])),
+                 row_cycles[row])
+                for row in range(9)]
+    col_keys = [(col_weights[col],
+                 tuple(sorted([weight * 16 + row_ranks[row]
+                               for row, weight in enumerate(cols[col]) if weight])),
+                 col_cycles[col])
+                for col in range(9)]
+    return row_keys, col_keys
+
+
+def _cycle_types(lines):
+    """Returns invariants of the full rows (or columns) of a puzzle, which tell the rows of a
+    completed grid apart where the weights of _line_keys() are all equal.
+
+    Two full rows define a permutation of the digits: the digit of the one row is mapped to the
+    digit of the other row in the same column. Its cycle type (the sorted cycle lengths) does
+    not change under relabeling or column permutations. The invariant of a full row is the
+    sorted cycle types with the other full rows of its band and with those of the other bands.
+
+    Args:
+        lines (list of list of int): the values of the 9 rows (or columns)
+
+    Returns:
+        list of tuple: the invariant of every line, () for a line that is not full
+    """
+    full = [index for index, line in enumerate(lines) if 0 not in line]
+    keys = [()] * 9
+    if len(full) < 2:
+        return keys
+    positions = {}
+    for index in full:
+        position = [0] * 10
+        for col, value in enumerate(lines[index]):
+            position[value] = col
+        positions[index] = position
+    for index in full:
+        position = positions[index]
+        same_band = []
+        other_bands = []
+        for other in full:
+            if other == index:
+                continue
+            target = lines[other]
+            seen = [False] * 10
+            lengths = []
+            for start in range(1, 10):
+                length = 0
+                value = start
+                while not seen[value]:
+                    seen[value] = True
+                    value = target[position[value]]
+                    length += 1
+                if length:
+                    lengths.append(length)
+            lengths.sort()
+            (same_band if other // 3 == index // 3 else other_bands).append(tuple(lengths))
+        keys[index] = (tuple(sorted(same_band)), tuple(sorted(other_bands)))
+    return keys
+
+
+def _tied_orders(items, keys, empty_key):
+    """Returns all orders of the items that sort them by their keys. Items with equal keys can
+    be in any order, except for empty lines or bands (with the empty_key): they are
+    interchangeable, so only one order of them is kept.
+    """
+    items = sorted(items, key=keys.__getitem__)
+    if len({keys[item] for item in items}) == len(items):
+        return [tuple(items)]
+    choices = []
+    for key, group in itertools.groupby(items, key=keys.__getitem__):
+        group = tuple(group)
+        choices.append([group] if key == empty_key else list(itertools.permutations(group)))
+    return [sum(parts, ()) for parts in itertools.product(*choices)]
+
+
+def _band_keys(keys):
+    """Returns the keys of the 3 bands (or stacks) for the keys of the 9 rows (or columns)."""
+    return [tuple(sorted(keys[band * 3:band * 3 + 3])) for band in range(3)]
+
+
+def _line_orders(keys):
+    """Returns all orders of the 9 rows (or columns) of a puzzle that put the bands (stacks) in
+    the order of their keys and the lines within every band in the order of their keys.
+    """
+    within = [_tied_orders(range(band * 3, band * 3 + 3), keys, _EMPTY_KEY)
+              for band in range(3)]
+    band_orders = _tied_orders(range(3), _band_keys(keys), (_EMPTY_KEY,) * 3)
+    return [sum(parts, ()) for bands in band_orders
+            for parts in itertools.product(*(within[band] for band in bands))]
+
+
+def canonical_form(puzzle):
+    """Returns the canonical form of a puzzle: a puzzle that is the same for all equivalent
+    puzzles, together with the transformation that gives it.
+
+    Cheap invariants are used first to cut down the transformations that have to be tried:
+    the grid is transposed or not so that its rows come before its columns in the order of
+    their keys (see _line_keys()), the bands and stacks are sorted by the keys of their lines
+    and the rows and columns within them by their own keys. Only lines with equal keys can
+    still be swapped, and empty lines are interchangeable, so usually a few transformations
+    are left. Among them the canonical form is the lexicographically smallest result (empty
+    cells first, digits relabeled in order of first appearance), built row by row while only
+    the transformations that give the smallest rows so far are kept. The form is exact: all
+    equivalent puzzles get the same one.
+
+    Args:
+        puzzle (Sudoku, String or list of int): the puzzle, as a Sudoku, a line of 81
+        characters or a flat list of 81 values
+
+    Raises:
+        ValueError: if a puzzle line does not have 81 digits and '.' characters, the puzzle
+        is not a 9 x 9 puzzle or it has a value twice in a row, column or box.
+
+    Returns:
+        String, Transform: the canonical puzzle as a line ('.' for an empty cell) and the
+        transformation that turns the puzzle into it
+    """
+    grid = _as_grid(puzzle)
+    sources = (grid, [grid[(index % 9) * 9 + index // 9] for index in range(81)])
+    row_keys, col_keys = _line_keys(grid)
+    signatures = ((sorted(_band_keys(row_keys)), sorted(_band_keys(col_keys))),
+                  (sorted(_band_keys(col_keys)), sorted(_band_keys(row_keys))))
+    orientations = [transpose for transpose in (0, 1)
+                    if signatures[transpose] == min(signatures)]
+
+    # the transformations still to be tried, as (transpose, rows so far, column order,
+    # labels, number of labels used), and the rows that can come next after a choice of rows
+    candidates = []
+    next_rows = []
+    for transpose in (0, 1):
+        keys = (row_keys, col_keys) if transpose == 0 else (col_keys, row_keys)
+        following = {}
+        if transpose in orientations:
+            for rows in _line_orders(keys[0]):
+                for position in range(9):
+                    options = following.setdefault(rows[:position], [])
+                    if rows[position] not in options:
+                        options.append(rows[position])
+            candidates.extend((transpose, (), cols, [0] * 10, 0)
+                              for cols in _line_orders(keys[1]))
+        next_rows.append(following)
+
+    for position in range(9):
+        best = None
+        extended = []
+        for transpose, rows, cols, labels, number in candidates:
+            source = sources[transpose]
+            for row in next_rows[transpose][rows]:
+                base = row * 9
+                new_labels = labels
+                new_number = number
+                output = []
+                # compare with the best row so far while building the row, to give up early
+                smaller = best is None
+                for position_in_row, col in enumerate(cols):
+                    label = new_labels[source[base + col]]
+                    if not label and source[base + col]:
+                        if new_labels is labels:
+                            new_labels = labels[:]
+                        new_number += 1
+                        label = new_labels[source[base + col]] = new_number
+                    if not smaller:
+                        if label > best[position_in_row]:
+                            break
+                        smaller = label < best[position_in_row]
+                    output.append(label)
+                else:
+                    if smaller:
+                        best = output
+                        extended = []
+                    extended.append((transpose, rows + (row,), cols, new_labels, new_number))
+        candidates = extended
+
+    transpose, rows, cols, labels, number = candidates[0]
+    # digits that do not occur in the puzzle get the remaining labels in increasing order
+    for value in range(1, 10):
+        if not labels[value]:
+            number += 1
+            labels[value] = number
+    result = Transform(bool(transpose), rows, cols, tuple(labels))
+    return _line(transform(grid, result)), result
+
+
+def transform(grid, transformation):
+    """Applies a transformation to a puzzle or solution.
+
+    Args:
+        grid (list of int): flat list of 81 values
+        transformation (Transform): the transformation
+
+    Returns:
+        list of int: the transformed grid
+    """
+    if transformation.transpose:
+        grid = [grid[(index % 9) * 9 + index // 9] for index in range(81)]
+    labels = transformation.labels
+    return [labels[grid[row * 9 + col]] for row in transformation.rows
+            for col in transformation.cols]
+
+
+def restore(grid, transformation):
+    """Reverts a transformation, e.g. to turn the solution of a canonical puzzle into the
+    solution of the original puzzle.
+
+    Args:
+        grid (list of int): flat list of 81 values
+        transformation (Transform): the transformation applied earlier
+
+    Returns:
+        list of int: the grid before the transformation
+    """
+    inverse = [0] * 10
+    for value, label in enumerate(transformation.labels):
+        inverse[label] = value
+    original = [0] * 81
+    for position, row in enumerate(transformation.rows):
+        for offset, col in enumerate(transformation.cols):
+            original[row * 9 + col] = inverse[grid[position * 9 + offset]]
+    if transformation.transpose:
+        original = [original[(index % 9) * 9 + index // 9] for index in range(81)]
+    return original
+
+
+def _line(grid):
+    """Returns a puzzle as a line of 81 characters, '.' for an empty cell."""
+    return ''.join(str(value) if value else '.' for value in grid)
+
+
+class SolutionCache:
+    """Bounded LRU cache of solutions by canonical puzzle, with an optional store on disk.
+
+    Args:
+        maxsize (int, optional): number of puzzles kept in memory. Defaults to 4096.
+        file_name (String, optional): dbm file that keeps the solutions across runs; it is
+        created if it does not exist. Defaults to None (memory only).
+    """
+
+    def __init__(self, maxsize=4096, file_name=None):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        # canonical puzzle -> canonical solution
+        self._canonical = collections.OrderedDict()
+        # puzzle exactly as seen before -> solution
+        self._raw = collections.OrderedDict()
+        self._store = None if file_name is None else dbm.open(file_name, 'c')
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._canonical)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Closes the store on disk, if any."""
+        if self._store is not None:
+            self._store.close()
+            self._store = None
+
+    def _remember(self, cache, key, value):
+        """Adds or refreshes an entry of an LRU dictionary and evicts the oldest entry."""
+        cache[key] = value
+        cache.move_to_end(key)
+        if len(cache) > self.maxsize:
+            cache.popitem(last=False)
+
+    def get(self, puzzle):
+        """Looks up the solution of a puzzle.
+
+        Args:
+            puzzle (Sudoku or String): the puzzle, as a Sudoku or a line of 81 characters
+
+        Raises:
+            ValueError: if a puzzle line does not have 81 digits and '.' characters, or the
+            puzzle has a value twice in a row, column or box.
+
+        Returns:
+            String: the solution as 81 digits in the orientation of the puzzle, or None if no
+            equivalent puzzle is in the cache
+        """
+        return self._lookup(puzzle)[0]
+
+    def put(self, puzzle, solution):
+        """Adds the solution of a puzzle to the cache.
+
+        Args:
+            puzzle (Sudoku or String): the puzzle, as a Sudoku or a line of 81 characters
+            solution (String): the solution as 81 digits
+        """
+        grid = _as_grid(puzzle)
+        self._add(grid, solution, *canonical_form(grid))
+
+    def solve(self, puzzle, solver='backtrack', max_nodes=None, timeout=None):
+        """Returns the solution of a puzzle from the cache, or solves it and adds it to the cache.
+
+        Args:
+            puzzle (Sudoku or String): the puzzle, as a Sudoku or a line of 81 characters
+            solver (String, optional): 'backtrack' or 'dlx', used on a cache miss. Defaults to
+            'backtrack'.
+            max_nodes (int, optional): node limit on a cache miss. Defaults to None (no limit).
+            timeout (float, optional): time limit in seconds on a cache miss. Defaults to None
+            (no limit).
+
+        Returns:
+            PuzzleResult: the outcome, see batch.py
+        """
+        line = _line(puzzle.grid) if isinstance(puzzle, Sudoku) else puzzle
+        try:
+            solution, grid, key, transformation = self._lookup(puzzle)
+        except ValueError as exception:
+            return PuzzleResult(line, INVALID, None, str(exception))
+        if solution is not None:
+            return PuzzleResult(line, SOLVED, solution, None)
+        result = solve_puzzle(line, solver, max_nodes, timeout)
+        if result.status == SOLVED:
+            self._add(grid, result.solution, key, transformation)
+        return result
+
+    def _lookup(self, puzzle):
+        """Returns the solution of a puzzle (None on a miss), its values, its canonical form
+        and the transformation to it. After a hit on the raw puzzle only the solution is given.
+        """
+        if isinstance(puzzle, str):
+            # a puzzle seen before in the same form is found without parsing it
+            raw = puzzle.strip().replace('0', '.')
+            grid = None
+        else:
+            grid = _as_grid(puzzle)
+            raw = _line(grid)
+        solution = self._raw.get(raw)
+        if solution is not None:
+            self._raw.move_to_end(raw)
+            self.hits += 1
+            return solution, None, None, None
+
+        if grid is None:
+            grid = _as_grid(puzzle)
+        key, transformation = canonical_form(grid)
+        canonical = self._canonical.get(key)
+        if canonical is None and self._store is not None:
+            stored = self._store.get(key)
+            if stored is not None:
+                canonical = stored.decode('ascii')
+        if canonical is None:
+            self.misses += 1
+            return None, grid, key, transformation
+        self._remember(self._canonical, key, canonical)
+        solution = ''.join(map(str, restore([int(char) for char in canonical], transformation)))
+        self._remember(self._raw, raw, solution)
+        self.hits += 1
+        return solution, grid, key, transformation
+
+    def _add(self, grid, solution, key, transformation):
+        """Adds a solution under the raw and the canonical puzzle."""
+        canonical = ''.join(map(str, transform([int(char) for char in solution],
+                                               transformation)))
+        self._remember(self._canonical, key, canonical)
+        self._remember(self._raw, _line(grid), solution)
+        if self._store is not None:
+            self._store[key] = canonical
@@ -0,0 +1,211 @@
+"""Exact cover solver for Sudoku puzzles, based on Donald Knuth's Algorithm X with
+'Dancing Links'.
+
+A Sudoku puzzle is an exact cover problem with 324 constraints (columns) for a 9 x 9 board, and
+4 * size ** 2 for other sizes: every cell holds one value and every row, column and box holds
+every value exactly once. Each possible placement of a value in a cell (a matrix row) covers
+exactly 4 of those constraints. The constraints already met by the given values are left out
+of the matrix and only the options that are still open in the empty cells become matrix rows.
+"""
+
+import time
+
+from sudoku import SearchLimitReached, SearchStats
+
+
+class _ExactCoverMatrix:
+    """Sparse 0/1 matrix stored as circular doubly linked lists in flat arrays. Node 0 is the
+    root, nodes 1 to number_of_columns are the column headers and the remaining nodes are the
+    1-entries of the matrix.
+    """
+
+    def __init__(self, number_of_columns):
+        count = number_of_columns + 1
+        self.left = [i - 1 for i in range(count)]
+        self.left[0] = number_of_columns
+        self.right = [i + 1 for i in range(count)]
+        self.right[number_of_columns] = 0
+        self.up = list(range(count))
+        self.down = list(range(count))
+        self.column = list(range(count))
+        self.row = [-1] * count
+        self.size = [0] * count
+        # work done by the last search
+        self.stats = SearchStats()
+
+    def add_row(self, row_id, columns):
+        """Appends a matrix row with 1-entries in the given columns (1-based header numbers)."""
+        first = len(self.left)
+        for offset, col in enumerate(columns):
+            node = first + offset
+            self.left.append(node - 1 if offset else first + len(columns) - 1)
+            self.right.append(node + 1 if offset < len(columns) - 1 else first)
+            self.up.append(self.up[col])
+            self.down.append(col)
+            self.down[self.up[col]] = node
+            self.up[col] = node
+            self.column.append(col)
+            self.row.append(row_id)
+            self.size[col] += 1
+
+    def remove_column(self, col):
+        """Removes a column header from the header list, without touching its rows."""
+        self.right[self.left[col]] = self.right[col]
+        self.left[self.right[col]] = self.left[col]
+
+    def cover(self, col):
+        """Removes a column and all rows that have a 1-entry in that column."""
+        left, right, up, down = self.left, self.right, self.up, self.down
+        column, size = self.column, self.size
+        self.stats.covers += 1
+        right[left[col]] = right[col]
+        left[right[col]] = left[col]
+        i = down[col]
+        while i != col:
+            j = right[i]
+            while j != i:
+                down[up[j]] = down[j]
+                up[down[j]] = up[j]
+                size[column[j]] -= 1
+                j = right[j]
+            i = down[i]
+
+    def uncover(self, col):
+        """Reverts cover(col)."""
+        left, right, up, down = self.left, self.right, self.up, self.down
+        column, size = self.column, self.size
+        i = up[col]
+        while i != col:
+            j = left[i]
+            while j != i:
+                size[column[j]] += 1
+                down[up[j]] = j
+                up[down[j]] = j
+                j = left[j]
+            i = up[i]
+        right[left[col]] = col
+        left[right[col]] = col
+
+    def smallest_column(self):
+        """Returns the remaining column with the fewest 1-entries, or 0 if no columns are left."""
+        right, size = self.right, self.size
+        best = 0
+        best_size = len(self.left)
+        col = right[0]
+        while col != 0:
+            if size[col] < best_size:
+                best = col
+                best_size = size[col]
+                if best_size <= 1:
+                    break
+            col = right[col]
+        return best
+
+    def search(self, max_nodes=None, deadline=None):
+        """Iterative Algorithm X. Returns the row ids of the first exact cover found, or None
+        if there is no exact cover.
+
+        Raises:
+            SearchLimitReached: when max_nodes rows were tried or the deadline has passed.
+        """
+        right, left, down, column = self.right, self.left, self.down, self.column
+        stats = self.stats
+        if right[0] == 0:
+            return []
+        chosen = []
+        col = self.smallest_column()
+        self.cover(col)
+        node = down[col]
+        while True:
+            if node != col:
+                stats.nodes += 1
+                if max_nodes is not None and stats.nodes > max_nodes:
+                    raise SearchLimitReached(f"node limit of {max_nodes} reached")
+                if deadline is not None and time.perf_counter() > deadline:
+                    raise SearchLimitReached("timeout reached")
+                chosen.append(node)
+                if len(chosen) > stats.max_depth:
+                    stats.max_depth = len(chosen)
+                j = right[node]
+                while j != node:
+                    self.cover(column[j])
+                    j = right[j]
+                if right[0] == 0:
+                    return [self.row[i] for i in chosen]
+                col = self.smallest_column()
+                self.cover(col)
+                node = down[col]
+                continue
+
+            # all rows of this column have been tried: backtrack
+            self.uncover(col)
+            if not chosen:
+                return None
+            node = chosen.pop()
+            stats.backtracks += 1
+            col = column[node]
+            j = left[node]
+            while j != node:
+                self.uncover(column[j])
+                j = left[j]
+            node = down[node]
+
+
+def solve_exact_cover(sudoku, max_nodes=None, timeout=None):
+    """Solves a Sudoku puzzle as an exact cover problem with Dancing Links. The values and
+    options of the puzzle are not changed.
+
+    The work done is counted in a new SearchStats object in the attribute 'stats' of the puzzle:
+    matrix rows tried as nodes and covered columns as covers.
+
+    Args:
+        sudoku (Sudoku): the puzzle to solve
+        max_nodes (int, optional): maximum number of matrix rows tried. Defaults to None
+        (no limit).
+        timeout (float, optional): maximum number of seconds for the search. Defaults to None
+        (no limit).
+
+    Raises:
+        SearchLimitReached: when the search hits max_nodes or timeout.
+
+    Returns:
+        list of lists of int: the solved grid (9 x 9 for the default box size), or None if the
+        puzzle has no solution.
+    """
+    deadline = None if timeout is None else time.perf_counter() + timeout
+    size = sudoku.size
+    cells = size * size
+    cell_box = sudoku.tables.cell_box
+
+    # column numbers (1-based) of the four constraints of value v (0-based) in a cell
+    def constraints(index, value):
+        return (1 + index,
+                1 + cells + index // size * size + value,
+                1 + 2 * cells + index % size * size + value,
+                1 + 3 * cells + cell_box[index] * size + value)
+
+    matrix = _ExactCoverMatrix(4 * cells)
+    satisfied = set()
+    for index, value in enumerate(sudoku.grid):
+        if value != 0:
+            satisfied.update(constraints(index, value - 1))
+    for index, value in enumerate(sudoku.grid):
+        if value == 0:
+            mask = sudoku.candidates[index]
+            for option in range(size):
+                if mask & (1 << option):
+                    matrix.add_row(index * size + option, constraints(index, option))
+    for col in satisfied:
+        matrix.remove_column(col)
+
+    try:
+        rows = matrix.search(max_nodes=max_nodes, deadline=deadline)
+    finally:
+        sudoku.stats = matrix.stats
+    if rows is None:
+        return None
+    grid = sudoku.grid[:]
+    for row_id in rows:
+        index, option = divmod(row_id, size)
+        grid[index] = option + 1
+    return [grid[i * size:i * size + size] for i in range(size)]
@@ -0,0 +1,260 @@
+"""SUDOKU GENERATOR
+
+Generates new Sudoku puzzles with a unique solution:
+
+1. a random complete grid is created by filling the three independent diagonal boxes with
+   random permutations and completing the grid with the solver;
+2. hints are removed in random order, as long as the puzzle keeps a unique solution;
+3. the puzzle is rated by the hardest technique the solver needs (see rate()).
+
+Every puzzle is generated from its own seed, derived from the corpus seed and the number of the
+puzzle, so a corpus is reproducible whatever the number of worker processes.
+
+Usage:
+    python generator.py -n 1000 --seed 42 -o puzzles.txt
+    python generator.py -n 1000 --seed 42 -o puzzles.csv --symmetric --workers 8
+
+"""
+
+import argparse
+import collections
+import csv
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import sudoku
+from strategies import STRATEGIES
+from sudoku_io import format_grid
+
+# difficulty grades, from easy to hard
+GRADES = ('easy', 'medium', 'hard', 'expert')
+
+# strategies that make a puzzle 'hard'; any other strategy makes it 'expert'
+HARD_TECHNIQUES = {'locked_candidates', 'naked_pairs', 'hidden_pairs'}
+
+GeneratedPuzzle = collections.namedtuple(
+    'GeneratedPuzzle', ['puzzle', 'solution', 'grade', 'clues', 'guesses', 'seed'])
+GeneratedPuzzle.__doc__ = """A generated puzzle.
+
+puzzle (String): the puzzle as 81 characters, '.' for an empty cell
+solution (String): the solution as 81 digits
+grade (String): the difficulty, one of GRADES
+clues (int): the number of hints in the puzzle
+guesses (int): the number of guesses the solver needed with all strategies enabled
+seed (String): the seed the puzzle was generated from
+"""
+
+
+def random_variant(grid, rng):
+    """Returns a random variant of a grid with the same solving difficulty: the digits are
+    relabeled, the bands, the rows within each band, the stacks and the columns within each
+    stack are permuted, and the grid may be transposed.
+
+    Args:
+        grid (list of int): flat list of 81 values, 0 for an empty cell
+        rng (random.Random): source of randomness
+
+    Returns:
+        list of int: the variant as a flat list of 81 values
+    """
+    digits = list(range(1, 10))
+    rng.shuffle(digits)
+    relabel = [0] + digits
+
+    def order():
+        bands = rng.sample(range(3), 3)
+        return [band * 3 + row for band in bands for row in rng.sample(range(3), 3)]
+
+    rows = order()
+    cols = order()
+    transpose = rng.random() < 0.5
+    variant = []
+    for row in rows:
+        for col in cols:
+            index = col * 9 + row if transpose else row * 9 + col
+            variant.append(relabel[grid[index]])
+    return variant
+
+
+def random_grid(rng):
+    """Creates a random complete Sudoku grid.
+
+    Args:
+        rng (random.Random): source of randomness
+
+    Returns:
+        list of int: the grid as a flat list of 81 values
+    """
+    grid = [0] * 81
+    for box in (0, 4, 8):
+        for index, value in zip(sudoku.UNITS[18 + box], rng.sample(range(1, 10), 9)):
+            grid[index] = value
+    puzzle = sudoku.Sudoku.from_grid(grid)
+    for solution in puzzle.search():
+        return random_variant(solution.grid, rng)
+    raise AssertionError("a grid with only the diagonal boxes filled is always solvable")
+
+
+def minimize(solution, rng, symmetric=False, max_nodes=None):
+    """Removes hints from a complete grid in random order, as long as the puzzle keeps a unique
+    solution. The result is minimal: no further hint can be removed.
+
+    Args:
+        solution (list of int): the complete grid as a flat list of 81 values
+        rng (random.Random): source of randomness
+        symmetric (bool, optional): remove hints in pairs that are symmetric under a 180 degree
+        rotation. The result is then minimal among symmetric puzzles. Defaults to False.
+        max_nodes (int, optional): node limit of each uniqueness check; a removal for which
+        the check hits the limit is not made. Defaults to None (no limit).
+
+    Returns:
+        list of int: the puzzle as a flat list of 81 values, 0 for an empty cell
+    """
+    grid = list(solution)
+    cells = list(range(41 if symmetric else 81))
+    rng.shuffle(cells)
+    for index in cells:
+        removed = {index, 80 - index} if symmetric else {index}
+        kept = {cell: grid[cell] for cell in removed}
+        for cell in removed:
+            grid[cell] = 0
+        try:
+            unique = sudoku.Sudoku.from_grid(grid).has_unique_solution(max_nodes=max_nodes)
+        except sudoku.SearchLimitReached:
+            unique = False
+        if not unique:
+            for cell, value in kept.items():
+                grid[cell] = value
+    return grid
+
+
+def rate(grid):
+    """Rates the difficulty of a puzzle by the hardest technique the solver needs, with all
+    strategies of strategies.py enabled:
+
+    - easy: naked singles only;
+    - medium: naked and hidden singles;
+    - hard: locked candidates and naked or hidden pairs;
+    - expert: triples, X-Wing or Swordfish, or guesses.
+
+    Args:
+        grid (list of int): the puzzle as a flat list of 81 values
+
+    Returns:
+        String, SearchStats: the grade (one of GRADES) and the statistics of the search
+    """
+    puzzle = sudoku.Sudoku.from_grid(grid)
+    for _ in puzzle.search(strategies=tuple(STRATEGIES)):
+        break
+    stats = puzzle.stats
+    if stats.nodes or set(stats.techniques) - HARD_TECHNIQUES:
+        grade = 'expert'
+    elif stats.techniques:
+        grade = 'hard'
+    else:
+        grade = 'easy' if stats.hidden_singles == 0 else 'medium'
+    return grade, stats
+
+
+def generate_puzzle(seed, symmetric=False, max_nodes=None):
+    """Generates one puzzle from a seed.
+
+    Args:
+        seed (String or int): seed of the puzzle; the same seed always gives the same puzzle
+        symmetric (bool, optional): generate a puzzle with 180 degree rotational symmetry.
+        Defaults to False.
+        max_nodes (int, optional): node limit of each uniqueness check, see minimize().
+        Defaults to None (no limit).
+
+    Returns:
+        GeneratedPuzzle: the puzzle with its solution and rating
+    """
+    rng = random.Random(seed)
+    solution = random_grid(rng)
+    grid = minimize(solution, rng, symmetric=symmetric, max_nodes=max_nodes)
+    grade, stats = rate(grid)
+    return GeneratedPuzzle(format_grid(grid), ''.join(map(str, solution)), grade,
+                           81 - grid.count(0), stats.nodes, str(seed))
+
+
+def _generate_range(seed, first, count, symmetric, max_nodes):
+    """Worker process entry point: generates the puzzles first to first + count - 1."""
+    return [generate_puzzle(f"{seed}:{number}", symmetric, max_nodes)
+            for number in range(first, first + count)]
+
+
+def generate_many(count, seed=0, workers=1, chunk_size=16, symmetric=False, max_nodes=None):
+    """Generates a reproducible corpus of puzzles, optionally on a pool of worker processes.
+    Puzzle number n is generated from the seed "<seed>:<n>", so the corpus does not depend on
+    the number of workers.
+
+    Args:
+        count (int): number of puzzles
+        seed (int, optional): seed of the corpus. Defaults to 0.
+        workers (int, optional): number of worker processes; 1 generates in the current
+        process and None uses one process per CPU. Defaults to 1.
+        chunk_size (int, optional): number of puzzles generated by a worker at once.
+        Defaults to 16.
+        symmetric (bool, optional): generate symmetric puzzles. Defaults to False.
+        max_nodes (int, optional): node limit of each uniqueness check. Defaults to None.
+
+    Yields:
+        GeneratedPuzzle: the puzzles, in order
+    """
+    firsts = range(0, count, chunk_size)
+    sizes = [min(chunk_size, count - first) for first in firsts]
+    if workers == 1:
+        for first, size in zip(firsts, sizes):
+            yield from _generate_range(seed, first, size, symmetric, max_nodes)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        chunks = pool.map(_generate_range, [seed] * len(sizes), firsts, sizes,
+                          [symmetric] * len(sizes), [max_nodes] * len(sizes))
+        for chunk in chunks:
+            yield from chunk
+
+
+def main(argv=None):
+    """Command line interface, see the module docstring."""
+    parser = argparse.ArgumentParser(description="Generate Sudoku puzzles with a unique "
+                                     "solution.")
+    parser.add_argument('-n', '--count', type=int, default=10, help="number of puzzles")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('-o', '--output', default='-',
+                        help="output file, '-' (default) for standard output. A .csv file "
+                        "gets the solution and rating of every puzzle as well.")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="number of worker processes (default: one per CPU)")
+    parser.add_argument('--symmetric', action='store_true',
+                        help="generate puzzles with 180 degree rotational symmetry")
+    args = parser.parse_args(argv)
+
+    start_time = time.time()
+    puzzles = generate_many(args.count, args.seed, args.workers, symmetric=args.symmetric)
+    output_file = sys.stdout if args.output == '-' else open(args.output, 'w', newline='')
+    grades = collections.Counter()
+    try:
+        if args.output.endswith('.csv'):
+            writer = csv.writer(output_file)
+            writer.writerow(GeneratedPuzzle._fields)
+            for puzzle in puzzles:
+                writer.writerow(puzzle)
+                grades[puzzle.grade] += 1
+        else:
+            for puzzle in puzzles:
+                output_file.write(puzzle.puzzle + '\n')
+                grades[puzzle.grade] += 1
+    finally:
+        if output_file is not sys.stdout:
+            output_file.close()
+
+    summary = ', '.join(f"{grades[grade]} {grade}" for grade in GRADES)
+    print(f"{args.count} puzzles ({summary}) in {time.time() - start_time:.2f} seconds",
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,21 +1,113 @@
 """SUDOKU SOLVER
 
-Used to load a sudoku puzzle from a csv file and then solve the puzzle.
+Solves Sudoku puzzles given on the command line or piped on standard input and prints one
+line per puzzle: the solution in line format, or the status ('unsolvable', 'limit' or
+'invalid') if there is none, with the reason on standard error. A puzzle is a line of 81
+characters ('0' or '.' for an empty cell) or the name of a space separated .csv file.
 
+Usage:
+    python main.py sudoku_evil1.csv sudoku_17.csv
+    python main.py --solver dlx < puzzles.txt
 
+Only the sudoku module is imported, so short runs are not dominated by start-up time.
 """
 
-import time
+import sys
+
 import sudoku
 
-start_time = time.time()
-s = sudoku.Sudoku(file_name='sudoku_evil1.csv')
-print(s)
-print(s.solve())
-print("--- %s seconds ---" % (time.time() - start_time))
-
-start_time = time.time()
-s = sudoku.Sudoku(file_name='sudoku_evil1.csv')
-print(s)
-s.alternative_solve()
-print("--- %s seconds ---" % (time.time() - start_time))
+USAGE = ("usage: python main.py [--solver backtrack|dlx|naive] [--max-nodes N] "
+         "[--timeout SECONDS] [puzzle or csv file ...]")
+
+
+def parse_arguments(arguments):
+    """Splits the command line into the solver options and the puzzles.
+
+    Args:
+        arguments (list of String): the command line arguments, without the program name
+
+    Raises:
+        ValueError: if an option is unknown or has no valid value.
+
+    Returns:
+        dict, list of String: the keyword arguments for Sudoku.find_solution() and the puzzles
+    """
+    options = {}
+    puzzles = []
+    arguments = iter(arguments)
+    for argument in arguments:
+        if not argument.startswith('--'):
+            puzzles.append(argument)
+            continue
+        name, _, value = argument.partition('=')
+        if name not in ('--solver', '--max-nodes', '--timeout'):
+            raise ValueError(f"unknown option {name}")
+        if not value:
+            value = next(arguments, None)
+            if value is None:
+                raise ValueError(f"option {name} needs a value")
+        if name == '--solver':
+            if value not in sudoku.SOLVERS:
+                raise ValueError(f"unknown solver '{value}', expected one of {sudoku.SOLVERS}")
+            options['solver'] = value
+        elif name == '--max-nodes':
+            options['max_nodes'] = int(value)
+        else:
+            options['timeout'] = float(value)
+    return options, puzzles
+
+
+def solve(text, options):
+    """Solves one puzzle given as a line or a csv file name.
+
+    Args:
+        text (String): the puzzle line or the file name
+        options (dict): keyword arguments for Sudoku.find_solution()
+
+    Returns:
+        String, String: the output line and the reason for standard error, or None if the
+        puzzle was solved
+    """
+    try:
+        if text.endswith('.csv'):
+            puzzle = sudoku.Sudoku(file_name=text)
+        else:
+            puzzle = sudoku.Sudoku.from_string(text)
+    except Exception as exception:
+        return 'invalid', f"{text}: {exception}"
+    result = puzzle.find_solution(**options)
+    if result.status == sudoku.SOLVED:
+        return result.line, None
+    if result.status == sudoku.LIMIT:
+        return result.status, f"{text}: search limit reached"
+    return result.status, f"{text}: no solution"
+
+
+def main(arguments=None):
+    """Solves the puzzles of the command line, or of standard input if none are given.
+
+    Returns:
+        int: the exit status: 0 if all puzzles were solved, 1 otherwise and 2 for bad options
+    """
+    try:
+        options, puzzles = parse_arguments(sys.argv[1:] if arguments is None else arguments)
+    except ValueError as exception:
+        print(f"{USAGE}\nerror: {exception}", file=sys.stderr)
+        return 2
+    if not puzzles:
+        puzzles = (line.strip() for line in sys.stdin)
+        puzzles = (line for line in puzzles if line and not line.startswith('#'))
+
+    status = 0
+    write = sys.stdout.write
+    for text in puzzles:
+        output, reason = solve(text, options)
+        write(output + '\n')
+        if reason is not None:
+            print(reason, file=sys.stderr)
+            status = 1
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
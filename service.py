@@ -0,0 +1,176 @@
+"""ASYNCHRONOUS SOLVING SERVICE
+
+An asyncio front end for the solvers, for embedding them in a process that serves requests.
+The solves run on a pool of worker processes, so the event loop is never blocked by a search:
+
+    async with SudokuService(workers=4) as service:
+        result = await service.solve(puzzle, timeout=0.5)
+
+Every request has its own deadline: the search is stopped after the timeout and the caller
+gets a result with status LIMIT, also when the request is still waiting for a free worker.
+Identical requests that arrive while a puzzle is being solved share that single computation.
+A computation is cancelled as soon as no request is waiting for it any more, after a timeout or
+cancellation; a search that a worker has already started can not be interrupted and runs until
+it finishes or hits its own timeout, but its result is discarded.
+
+If a worker process dies, the requests it was serving get a result with status ERROR and the
+service replaces the broken pool, so later requests are served as usual.
+"""
+
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from batch import ERROR, INVALID, LIMIT, PuzzleResult, solve_puzzle
+from sudoku import Sudoku
+from sudoku_io import check_line, format_line
+
+
+class _Computation:
+    """A solve running on the pool, shared by all requests for the same puzzle."""
+    __slots__ = ('future', 'executor', 'deadline', 'waiters')
+
+    def __init__(self, future, executor, deadline):
+        self.future = future
+        # the pool the computation runs on
+        self.executor = executor
+        # loop time at which the search stops, None without a timeout
+        self.deadline = deadline
+        self.waiters = 0
+
+
+class SudokuService:
+    """Solves puzzles on a pool of worker processes on behalf of asyncio tasks.
+
+    Args:
+        workers (int, optional): number of worker processes. Defaults to None (one per CPU).
+        solver (String, optional): 'backtrack' or 'dlx'. Defaults to 'backtrack'.
+        max_nodes (int, optional): node limit per puzzle. Defaults to None (no limit).
+        executor (concurrent.futures.Executor, optional): pool to run the solves on instead of
+        a new process pool, e.g. a ThreadPoolExecutor. It is not shut down by close().
+        Defaults to None.
+    """
+
+    def __init__(self, workers=None, solver='backtrack', max_nodes=None, executor=None):
+        if solver not in ('backtrack', 'dlx'):
+            raise ValueError(f"solver \'{solver}\' can not be used by the service")
+        self.solver = solver
+        self.max_nodes = max_nodes
+        self._workers = workers
+        self._own_executor = executor is None
+        self._executor = executor or ProcessPoolExecutor(max_workers=workers)
+        # computations in progress by puzzle
+        self._running = {}
+        self._closed = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Cancels the computations that have not started yet and shuts down the worker pool.
+        """
+        self._closed = True
+        for computation in self._running.values():
+            computation.future.cancel()
+        self._running.clear()
+        if self._own_executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    @property
+    def pending(self):
+        """int: number of distinct puzzles being solved."""
+        return len(self._running)
+
+    async def solve(self, puzzle, timeout=None):
+        """Solves a puzzle without blocking the event loop.
+
+        Args:
+            puzzle (String or Sudoku): the puzzle as a line of 81 characters ('0' or '.' for an
+            empty cell) or as a Sudoku object, which is not changed
+            timeout (float, optional): time limit in seconds for this request, including the
+            time spent waiting for a worker. Defaults to None (no limit).
+
+        Raises:
+            RuntimeError: if the service has been closed.
+            asyncio.CancelledError: if the request is cancelled.
+
+        Returns:
+            PuzzleResult: the outcome, see batch.py. The puzzle is reported back as given, or in
+            line format for a Sudoku object. Failures of the worker pool are reported with
+            status ERROR.
+        """
+        if self._closed:
+            raise RuntimeError("the service has been closed")
+        line = format_line(puzzle) if isinstance(puzzle, Sudoku) else puzzle
+        try:
+            key = check_line(line).replace('0', '.')
+        except ValueError as exception:
+            return PuzzleResult(line, INVALID, None, str(exception))
+
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        computation = self._running.get(key)
+        # join a running computation unless it stops before this request's deadline
+        if computation is None or (computation.deadline is not None
+                                   and (deadline is None or computation.deadline < deadline)):
+            try:
+                future = self._submit(loop, key, timeout)
+            except Exception as exception:
+                return PuzzleResult(line, ERROR, None, f"{type(exception).__name__}: {exception}")
+            computation = _Computation(future, self._executor, deadline)
+            self._running[key] = computation
+            future.add_done_callback(lambda _: self._finished(key, computation))
+
+        computation.waiters += 1
+        try:
+            result = await asyncio.wait_for(asyncio.shield(computation.future), timeout)
+        except asyncio.TimeoutError:
+            return PuzzleResult(line, LIMIT, None, f"timeout of {timeout} seconds reached")
+        except Exception as exception:  # e.g. a worker process died
+            if isinstance(exception, BrokenProcessPool):
+                self._replace_broken_pool(computation.executor)
+            return PuzzleResult(line, ERROR, None, f"{type(exception).__name__}: {exception}")
+        finally:
+            computation.waiters -= 1
+            # nobody is waiting for the result any more after a timeout or cancellation; the
+            # computation is forgotten at once, so a request in the same tick starts a new one
+            if computation.waiters == 0 and not computation.future.done():
+                computation.future.cancel()
+                self._finished(key, computation)
+        return result._replace(puzzle=line)
+
+    def _submit(self, loop, key, timeout):
+        """Starts solving a puzzle on the pool, on a new pool if the current one is broken."""
+        executor = self._executor
+        try:
+            return loop.run_in_executor(executor, solve_puzzle, key, self.solver,
+                                        self.max_nodes, timeout)
+        except BrokenProcessPool:
+            if not self._replace_broken_pool(executor):
+                raise
+        return loop.run_in_executor(self._executor, solve_puzzle, key, self.solver,
+                                    self.max_nodes, timeout)
+
+    def _replace_broken_pool(self, broken):
+        """Replaces a pool in which a worker process died, unless it has been replaced already.
+
+        Args:
+            broken (concurrent.futures.Executor): the broken pool
+
+        Returns:
+            boolean: False if the pool can not be replaced because the service does not own it.
+        """
+        if not self._own_executor:
+            return False
+        if self._executor is broken and not self._closed:
+            broken.shutdown(wait=False, cancel_futures=True)
+            self._executor = ProcessPoolExecutor(max_workers=self._workers)
+        return True
+
+    def _finished(self, key, computation):
+        """Forgets a computation once it is done, unless it has been replaced already."""
+        if self._running.get(key) is computation:
+            del self._running[key]
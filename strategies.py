@@ -0,0 +1,191 @@
+"""Logical solving strategies beyond naked and hidden singles.
+
+Every strategy is a function that takes the flat list of 81 candidate masks of a puzzle (see
+sudoku.py) and returns a list of (index, value) eliminations: the value can be removed from
+the options of the cell with that index. An empty list means the strategy found nothing. The
+strategies do not change the candidates themselves; Sudoku.propagate() applies the
+eliminations, so they are recorded on the trail and undone on backtracking.
+
+The strategies, by name, from simple to complex:
+
+- locked_candidates: pointing (the options for a value in a box all lie in one row or column,
+  so the value can be removed from the rest of that row or column) and claiming (the options
+  for a value in a row or column all lie in one box, so it can be removed from the rest of the
+  box);
+- naked_pairs / naked_triples: 2 (3) cells of a unit that together have only 2 (3) options
+  take those values, which can be removed from the other cells of the unit;
+- hidden_pairs / hidden_triples: 2 (3) values that are options in only the same 2 (3) cells of
+  a unit must go into those cells, so all other options can be removed from those cells;
+- x_wing / swordfish: the options for a value in 2 (3) rows lie in only 2 (3) columns, so the
+  value can be removed from those columns in all other rows (and the same with rows and
+  columns swapped).
+"""
+
+from itertools import combinations
+
+from sudoku import UNITS
+
+ROWS = UNITS[:9]
+COLUMNS = UNITS[9:18]
+BOXES = UNITS[18:]
+
+# intersections of a box with a row or column: (common cells, rest of box, rest of line)
+INTERSECTIONS = []
+for _box in BOXES:
+    for _line in ROWS + COLUMNS:
+        _common = [index for index in _line if index in _box]
+        if _common:
+            INTERSECTIONS.append((_common,
+                                  [index for index in _box if index not in _common],
+                                  [index for index in _line if index not in _common]))
+
+VALUE_BITS = [(value, 1 << (value - 1)) for value in range(1, 10)]
+
+
+def _union(candidates, indices):
+    mask = 0
+    for index in indices:
+        mask |= candidates[index]
+    return mask
+
+
+def locked_candidates(candidates):
+    """Pointing and claiming, see the module docstring."""
+    eliminations = []
+    for common, box_rest, line_rest in INTERSECTIONS:
+        common_mask = _union(candidates, common)
+        if not common_mask:
+            continue
+        box_mask = _union(candidates, box_rest)
+        line_mask = _union(candidates, line_rest)
+        pointing = common_mask & ~box_mask & line_mask
+        claiming = common_mask & ~line_mask & box_mask
+        for value, bit in VALUE_BITS:
+            if pointing & bit:
+                eliminations.extend((index, value) for index in line_rest
+                                    if candidates[index] & bit)
+            if claiming & bit:
+                eliminations.extend((index, value) for index in box_rest
+                                    if candidates[index] & bit)
+    return eliminations
+
+
+def _naked_subsets(candidates, size):
+    eliminations = []
+    for unit in UNITS:
+        open_cells = [index for index in unit if candidates[index]]
+        if len(open_cells) <= size:
+            continue
+        small = [index for index in open_cells if bin(candidates[index]).count('1') <= size]
+        for subset in combinations(small, size):
+            mask = _union(candidates, subset)
+            if bin(mask).count('1') != size:
+                continue
+            for index in open_cells:
+                if index not in subset and candidates[index] & mask:
+                    eliminations.extend((index, value) for value, bit in VALUE_BITS
+                                        if candidates[index] & mask & bit)
+    return eliminations
+
+
+def _hidden_subsets(candidates, size):
+    eliminations = []
+    for unit in UNITS:
+        # for every value the positions (bit per cell of the unit) where it is an option
+        positions = {}
+        for value, bit in VALUE_BITS:
+            where = 0
+            for position, index in enumerate(unit):
+                if candidates[index] & bit:
+                    where |= 1 << position
+            if where:
+                positions[value] = where
+        if len(positions) <= size:
+            continue
+        small = [value for value, where in positions.items()
+                 if bin(where).count('1') <= size]
+        for values in combinations(small, size):
+            where = 0
+            for value in values:
+                where |= positions[value]
+            if bin(where).count('1') != size:
+                continue
+            keep = 0
+            for value in values:
+                keep |= 1 << (value - 1)
+            for position, index in enumerate(unit):
+                if where & (1 << position) and candidates[index] & ~keep:
+                    eliminations.extend((index, value) for value, bit in VALUE_BITS
+                                        if candidates[index] & ~keep & bit)
+    return eliminations
+
+
+def _fish(candidates, size):
+    eliminations = []
+    for lines, crossing in ((ROWS, COLUMNS), (COLUMNS, ROWS)):
+        for value, bit in VALUE_BITS:
+            # for every line the positions (bit per crossing line) where the value is an option
+            positions = []
+            for number, line in enumerate(lines):
+                where = 0
+                for position, index in enumerate(line):
+                    if candidates[index] & bit:
+                        where |= 1 << position
+                if 2 <= bin(where).count('1') <= size:
+                    positions.append((number, where))
+            for subset in combinations(positions, size):
+                where = 0
+                for _, line_positions in subset:
+                    where |= line_positions
+                if bin(where).count('1') != size:
+                    continue
+                base = {number for number, _ in subset}
+                for position in range(9):
+                    if not where & (1 << position):
+                        continue
+                    for number, index in enumerate(crossing[position]):
+                        if number not in base and candidates[index] & bit:
+                            eliminations.append((index, value))
+    return eliminations
+
+
+def naked_pairs(candidates):
+    """Naked pairs, see the module docstring."""
+    return _naked_subsets(candidates, 2)
+
+
+def naked_triples(candidates):
+    """Naked triples, see the module docstring."""
+    return _naked_subsets(candidates, 3)
+
+
+def hidden_pairs(candidates):
+    """Hidden pairs, see the module docstring."""
+    return _hidden_subsets(candidates, 2)
+
+
+def hidden_triples(candidates):
+    """Hidden triples, see the module docstring."""
+    return _hidden_subsets(candidates, 3)
+
+
+def x_wing(candidates):
+    """X-Wing, see the module docstring."""
+    return _fish(candidates, 2)
+
+
+def swordfish(candidates):
+    """Swordfish, see the module docstring."""
+    return _fish(candidates, 3)
+
+
+# all strategies by name, from simple to complex
+STRATEGIES = {
+    'locked_candidates': locked_candidates,
+    'naked_pairs': naked_pairs,
+    'hidden_pairs': hidden_pairs,
+    'naked_triples': naked_triples,
+    'hidden_triples': hidden_triples,
+    'x_wing': x_wing,
+    'swordfish': swordfish,
+}
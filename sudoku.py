@@ -1,12 +1,372 @@
 """Single class module with the class Sudoku.
+
+Internally a puzzle is stored as a flat list of 81 cell values together with a 9-bit
+candidate mask per cell (bit ``v - 1`` is set when value ``v`` is still an option) and
+"used value" masks per row, column and box. The list-of-lists attributes ``sudoku`` and
+``options`` are still available as read-only snapshots of this representation.
+
+Every placement and every removed option is recorded on a trail, so the search can explore
+and undo moves on a single board instead of copying the puzzle for every guess.
 """
 
-import csv
+import struct
+import time
+
+
+def mask_to_values(mask, size=9):
+    """Converts a candidate bitmask into the set of values it represents.
+
+    Args:
+        mask (int): candidate bitmask
+        size (int, optional): the highest value. Defaults to 9.
+
+    Returns:
+        set: the values 1 to size for which the corresponding bit is set
+    """
+    return {value for value in range(1, size + 1) if mask & (1 << (value - 1))}
+
+
+def box_number(row, col, box_size=3):
+    """Returns the number (row-major) of the box that contains the cell."""
+    return (row // box_size) * box_size + col // box_size
+
+
+def box_cells(box, box_size=3):
+    """Returns the flat indices of the cells in a box."""
+    size = box_size * box_size
+    top = (box // box_size) * box_size * size + (box % box_size) * box_size
+    return [top + i * size + j for i in range(box_size) for j in range(box_size)]
+
+
+def peer_cells(index, box_size=3):
+    """Returns the flat indices of the peers of a cell (20 on a 9 x 9 board), i.e. the other
+    cells in the row, column and box of the cell.
+    """
+    size = box_size * box_size
+    row, col = divmod(index, size)
+    peers = set(range(row * size, row * size + size))
+    peers.update(range(col, size * size, size))
+    peers.update(box_cells(box_number(row, col, box_size), box_size))
+    peers.discard(index)
+    return sorted(peers)
+
+
+class _BitCount:
+    """Number of set bits of a candidate mask, for boards too large for a lookup list."""
+
+    if hasattr(int, 'bit_count'):
+        __getitem__ = staticmethod(int.bit_count)
+    else:
+        def __getitem__(self, mask):
+            return bin(mask).count('1')
+
+
+class _CountOffsets:
+    """Offsets of the values of a candidate mask in Sudoku.value_counts, for boards too large
+    for a lookup list.
+    """
+
+    def __init__(self, number_of_units):
+        self.number_of_units = number_of_units
+
+    def __getitem__(self, mask):
+        offsets = []
+        offset = 0
+        while mask:
+            if mask & 1:
+                offsets.append(offset)
+            mask >>= 1
+            offset += self.number_of_units
+        return offsets
+
+
+class BoardTables:
+    """Index tables shared by all puzzles with the same box size, so the solver paths never
+    have to compute rows, columns and boxes again. Use board_tables() to get them.
+
+    Attributes:
+        box_size (int): number of rows (and columns) of a box, 3 for a 9 x 9 board
+        size (int): number of rows, columns, boxes and values, i.e. box_size ** 2
+        cells (int): number of cells, i.e. size ** 2
+        all_options (int): candidate mask with the bits of all values set
+        units (tuple of tuples): flat cell indices of the units: the rows (units 0 to
+        size - 1), the columns (size to 2 * size - 1) and the boxes
+        cell_box (tuple of int): for every cell the number of its box
+        cell_units (tuple of tuples): for every cell the numbers of its row, column and box unit
+        peers (tuple of tuples): for every cell the flat indices of its peers
+        bit_count (list): number of set bits by candidate mask
+        bit_value (dict): value by single bit candidate mask
+        count_offsets (list of tuples): by candidate mask the offsets (value - 1) * number of
+        units of its values in Sudoku.value_counts
+    """
+    __slots__ = ('box_size', 'size', 'cells', 'all_options', 'units', 'cell_box',
+                 'cell_units', 'peers', 'bit_count', 'bit_value', 'count_offsets')
+
+    def __init__(self, box_size):
+        size = box_size * box_size
+        cells = size * size
+        self.box_size = box_size
+        self.size = size
+        self.cells = cells
+        self.all_options = (1 << size) - 1
+        self.units = (tuple(tuple(range(row * size, row * size + size)) for row in range(size))
+                      + tuple(tuple(range(col, cells, size)) for col in range(size))
+                      + tuple(tuple(box_cells(box, box_size)) for box in range(size)))
+        self.cell_box = tuple(box_number(index // size, index % size, box_size)
+                              for index in range(cells))
+        self.cell_units = tuple((index // size, size + index % size, 2 * size + box)
+                                for index, box in enumerate(self.cell_box))
+        self.peers = tuple(tuple(peer_cells(index, box_size)) for index in range(cells))
+        if size <= 16:
+            self.bit_count = [bin(mask).count('1') for mask in range(self.all_options + 1)]
+        else:
+            self.bit_count = _BitCount()
+        self.bit_value = {1 << (value - 1): value for value in range(1, size + 1)}
+        number_of_units = len(self.units)
+        if size <= 9:
+            self.count_offsets = [tuple(value * number_of_units for value in range(size)
+                                        if mask & (1 << value))
+                                  for mask in range(self.all_options + 1)]
+        else:
+            self.count_offsets = _CountOffsets(number_of_units)
+
+
+_BOARD_TABLES = {}
+
+
+def board_tables(box_size=3):
+    """Returns the index tables for a box size, building them on first use.
+
+    Args:
+        box_size (int, optional): number of rows of a box: 2 for 4 x 4 boards, 3 for 9 x 9,
+        4 for 16 x 16 and 5 for 25 x 25. Defaults to 3.
+
+    Raises:
+        ValueError: if the box size is smaller than 2.
+
+    Returns:
+        BoardTables: the tables
+    """
+    tables = _BOARD_TABLES.get(box_size)
+    if tables is None:
+        if box_size < 2:
+            raise ValueError(f"box size must be at least 2, got {box_size}")
+        tables = _BOARD_TABLES[box_size] = BoardTables(box_size)
+    return tables
+
+
+# The tables of 9 x 9 boards, used by the modules that only handle 9 x 9 puzzles.
+
+# flat cell indices of the 27 units: the rows (units 0 to 8), the columns (9 to 17) and the
+# boxes (18 to 26)
+UNITS = board_tables(3).units
+
+# for every cell the box number and the numbers of its row, column and box unit
+CELL_BOX = board_tables(3).cell_box
+CELL_UNITS = board_tables(3).cell_units
+
+# for every cell the flat indices of its 20 peers
+PEERS = board_tables(3).peers
+
+# bitmask with the bits for the values 1 to 9 set
+ALL_OPTIONS = board_tables(3).all_options
+
+# number of set bits for every 9-bit candidate mask
+BIT_COUNT = board_tables(3).bit_count
+
+# value of the lowest set bit, i.e. BIT_VALUE[mask & -mask] is the smallest option in mask
+BIT_VALUE = board_tables(3).bit_value
+
+
+def _file_box_size(filename):
+    """Returns the box size of the puzzle in a space separated .csv file, from the number of
+    values in its first row.
+    """
+    with open(filename, 'r') as file:
+        size = len(file.readline().split(' '))
+    box_size = round(size ** 0.5)
+    if box_size * box_size != size:
+        raise Exception(f"A row of {size} values does not fit any box size - wrong file syntax.")
+    return box_size
+
+
+# names of the solver backends that can be selected in Sudoku.solve()
+SOLVERS = ('backtrack', 'dlx', 'naive')
+
+# status values of a SolveResult
+SOLVED = 'solved'
+UNSOLVABLE = 'unsolvable'
+LIMIT = 'limit'
+
+# the characters of the values 1 to 35 in line format (see sudoku_io.py)
+SYMBOLS = '123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+# box size by length of a puzzle line
+LINE_BOX_SIZES = {16: 2, 81: 3, 256: 4, 625: 5}
+
+# translation of a bytes object of cell values into line format, and back; characters that
+# are not used in line format are translated to 255
+_TO_LINE = bytes.maketrans(bytes(range(len(SYMBOLS) + 1)), ('.' + SYMBOLS).encode('ascii'))
+_FROM_LINE = bytearray([255] * 256)
+_FROM_LINE[ord('.')] = _FROM_LINE[ord('0')] = 0
+for _value, _symbol in enumerate(SYMBOLS, 1):
+    _FROM_LINE[ord(_symbol)] = _FROM_LINE[ord(_symbol.lower())] = _value
+_FROM_LINE = bytes(_FROM_LINE)
+
+
+class SearchLimitReached(Exception):
+    """Raised when a search is stopped because its node limit or timeout was reached before
+    it could finish.
+    """
+
+
+class ContradictionError(Exception):
+    """Raised by Sudoku.place_value() when a legal value leaves an empty cell in its row,
+    column or box without options. The placement is undone before it is raised.
+    """
+
+
+class SearchStats:
+    """Counters and timings of a single search, see Sudoku.search().
+
+    Attributes:
+        nodes (int): number of guesses (for the DLX solver: matrix rows tried)
+        backtracks (int): number of guesses that were undone
+        naked_singles (int): number of naked singles placed
+        hidden_singles (int): number of hidden singles placed
+        covers (int): number of columns covered (DLX solver only)
+        max_depth (int): largest number of guesses on the search stack
+        techniques (dict): number of times each strategy of strategies.py made progress, by
+        name
+        propagation_time (float): seconds spent placing values and resolving singles
+        validity_time (float): seconds spent checking for contradictions and solutions
+        selection_time (float): seconds spent selecting the next move
+        The timings are only measured when the search is run with profile=True.
+    """
+    __slots__ = ('nodes', 'backtracks', 'naked_singles', 'hidden_singles', 'covers',
+                 'max_depth', 'techniques', 'propagation_time', 'validity_time',
+                 'selection_time')
+
+    def __init__(self):
+        self.nodes = 0
+        self.backtracks = 0
+        self.naked_singles = 0
+        self.hidden_singles = 0
+        self.covers = 0
+        self.max_depth = 0
+        self.techniques = {}
+        self.propagation_time = 0.0
+        self.validity_time = 0.0
+        self.selection_time = 0.0
+
+    @property
+    def propagations(self):
+        """int: number of propagation steps, i.e. singles placed or columns covered."""
+        return self.naked_singles + self.hidden_singles + self.covers
+
+    def as_dict(self):
+        """Returns the counters and timings as a dictionary."""
+        values = {name: getattr(self, name) for name in self.__slots__}
+        values['techniques'] = dict(self.techniques)
+        return values
+
+    def __repr__(self):
+        values = ', '.join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"SearchStats({values})"
+
+
+class SolveResult:
+    """Compact outcome of Sudoku.find_solution(), cheap to keep in memory by the million and
+    to store or send with to_bytes().
+
+    Attributes:
+        status (String): SOLVED, UNSOLVABLE or LIMIT
+        solution (bytes): the solution in line format, e.g. b'534678912...' for a 9 x 9
+        puzzle, or None if the puzzle was not solved
+        stats (SearchStats): counters and timings of the search
+    """
+    __slots__ = ('status', 'solution', 'stats')
+
+    _STATUSES = (SOLVED, UNSOLVABLE, LIMIT)
+    # status, solution length, number of techniques, the counters and the timings of the stats
+    _HEADER = struct.Struct('<BHB6I3d')
+    _COUNTERS = ('nodes', 'backtracks', 'naked_singles', 'hidden_singles', 'covers',
+                 'max_depth')
+    _TIMINGS = ('propagation_time', 'validity_time', 'selection_time')
+
+    def __init__(self, status, solution=None, stats=None):
+        self.status = status
+        self.solution = solution
+        self.stats = SearchStats() if stats is None else stats
+
+    @property
+    def line(self):
+        """String: the solution as a line, e.g. '534678912...', or None."""
+        return None if self.solution is None else self.solution.decode('ascii')
+
+    @property
+    def grid(self):
+        """list of int: the solution as a flat list of values, or None."""
+        return None if self.solution is None else list(self.solution.translate(_FROM_LINE))
+
+    def to_bytes(self):
+        """Returns the result in a compact binary form, see from_bytes().
+
+        Returns:
+            bytes: the status, the stats and the solution
+        """
+        stats = self.stats
+        solution = self.solution or b''
+        data = [self._HEADER.pack(self._STATUSES.index(self.status), len(solution),
+                                  len(stats.techniques),
+                                  *[getattr(stats, name) for name in self._COUNTERS],
+                                  *[getattr(stats, name) for name in self._TIMINGS]),
+                solution]
+        for name, count in stats.techniques.items():
+            encoded = name.encode('ascii')
+            data.append(struct.pack('<BI', len(encoded), count))
+            data.append(encoded)
+        return b''.join(data)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Rebuilds a result from the output of to_bytes().
+
+        Args:
+            data (bytes): the result in binary form
+
+        Returns:
+            SolveResult: the result
+        """
+        fields = cls._HEADER.unpack_from(data)
+        status, length, number_of_techniques = fields[:3]
+        stats = SearchStats()
+        for name, value in zip(cls._COUNTERS + cls._TIMINGS, fields[3:]):
+            setattr(stats, name, value)
+        position = cls._HEADER.size
+        solution = bytes(data[position:position + length]) if length else None
+        position += length
+        for _ in range(number_of_techniques):
+            size, count = struct.unpack_from('<BI', data, position)
+            position += 5
+            stats.techniques[bytes(data[position:position + size]).decode('ascii')] = count
+            position += size
+        return cls(cls._STATUSES[status], solution, stats)
+
+    def __eq__(self, other):
+        if not isinstance(other, SolveResult):
+            return NotImplemented
+        return (self.status == other.status and self.solution == other.solution
+                and self.stats.as_dict() == other.stats.as_dict())
+
+    def __repr__(self):
+        return f"SolveResult(status={self.status!r}, solution={self.line!r})"
+
 
 class Sudoku:
     """A class representing a Sudoku puzzle.
     """
-    def __init__(self, initial = None, file_name = None):
+    def __init__(self, initial = None, file_name = None, box_size = None):
         """Initializes a new Sudoku puzzle.
 
         Args:
@@ -14,42 +374,164 @@ class Sudoku:
             to None. If both \'initial\' and \'file_name\' are specified a ValueError is raised.
             file_name (String, optional): use to read a Sudoku puzzle from file. Defaults to None.
             If both \'initial\' and \'file_name\' are specified a ValueError is raised.
+            box_size (int, optional): number of rows of a box: 2 for a 4 x 4 puzzle, 3 for 9 x 9,
+            4 for 16 x 16, 5 for 25 x 25 and so on. Defaults to None: the size of \'initial\',
+            the size found in the file or else 3.
 
         Raises:
-            ValueError: [description]
+            ValueError: if both \'initial\' and \'file_name\' are specified, or if box_size
+            does not match \'initial\'.
         """
         if (initial is not None) and (file_name is not None):
             raise ValueError("can not specify \'file_name\' and \'initial\'")
+        if initial is not None and box_size not in (None, initial.box_size):
+            raise ValueError(f"can not copy a puzzle with box size {initial.box_size} into "
+                             f"box size {box_size}")
+        if file_name is not None and box_size is None:
+            box_size = _file_box_size(file_name)
 
         if initial is None:
-            self.sudoku = [[0 for x in range(9)] for y in range(9)]
-            self.options = [[set([1,2,3,4,5,6,7,8,9]) for x in range(9)] for y in range(9)]
+            tables = self.tables = board_tables(box_size or 3)
+            self.box_size = tables.box_size
+            self.size = size = tables.size
+            self.grid = [0] * tables.cells
+            self.candidates = [tables.all_options] * tables.cells
+            self.row_used = [0] * size
+            self.col_used = [0] * size
+            self.box_used = [0] * size
+            self.value_counts = [size] * (3 * size * size)
+            self.single_units = [0] * size
         else:
-            self.sudoku = [[initial.sudoku[y][x] for x in range(9)] for y in range(9)]
-            self.options = [[initial.options[y][x] for x in range(9)] for y in range(9)]
+            self.tables = initial.tables
+            self.box_size = initial.box_size
+            self.size = initial.size
+            self.grid = initial.grid[:]
+            self.candidates = initial.candidates[:]
+            self.row_used = initial.row_used[:]
+            self.col_used = initial.col_used[:]
+            self.box_used = initial.box_used[:]
+            self.value_counts = initial.value_counts[:]
+            self.single_units = initial.single_units[:]
+        # undo log of (index, previous candidate mask) for every candidate change and
+        # (~index, value) for every placed value
+        self.trail = []
+        # cells that became naked singles since the last resolve_naked_singles(), or None when
+        # unknown (the next call scans all cells)
+        self.naked_queue = None
+        # counters of the last search
+        self.stats = SearchStats()
 
         if file_name is not None:
             self.read_sudoku_from_file(file_name)
-            self.update_options()
+
+    @classmethod
+    def from_string(cls, line):
+        """Creates a puzzle from a line in line format: 81 characters, row by row, with '0' or
+        '.' for an empty cell (16, 256 or 625 characters for other sizes, see sudoku_io.py).
+        The values are checked and the options are built in a single pass.
+
+        Args:
+            line (String): the puzzle
+
+        Raises:
+            ValueError: if the line is not a valid puzzle.
+
+        Returns:
+            Sudoku: the puzzle
+        """
+        line = line.strip()
+        box_size = LINE_BOX_SIZES.get(len(line))
+        if box_size is None:
+            raise ValueError(f"expected 81 characters, got {len(line)}")
+        grid = list(line.encode('ascii', 'replace').translate(_FROM_LINE))
+        size = box_size * box_size
+        if max(grid) > size:
+            if box_size == 3:
+                raise ValueError("puzzle contains characters other than digits and '.'")
+            raise ValueError(f"puzzle contains characters other than '.' and the values 1 to "
+                             f"{SYMBOLS[size - 1]}")
+        return cls._from_values(grid, box_size)
+
+    @classmethod
+    def from_grid(cls, grid):
+        """Creates a puzzle from its values, given as a flat list or as a list of rows, with 0
+        for an empty cell. The values are checked and the options are built in a single pass.
+
+        Args:
+            grid (list of int or list of lists of int): the values, 81 of them (9 rows of 9)
+            for a 9 x 9 puzzle; the box size follows from the number of values
+
+        Raises:
+            ValueError: if the values are not a valid puzzle: rows of different lengths, values
+            that are not integers (bool included) or out of range, or a value that occurs twice
+            in a row, column or box.
+
+        Returns:
+            Sudoku: the puzzle
+        """
+        if grid and isinstance(grid[0], (list, tuple)):
+            if any(len(row) != len(grid) for row in grid):
+                raise ValueError(f"expected {len(grid)} rows of {len(grid)} values")
+            grid = [value for row in grid for value in row]
+        else:
+            grid = list(grid)
+        box_size = round(len(grid) ** 0.25)
+        if box_size < 2 or box_size ** 4 != len(grid):
+            raise ValueError(f"expected 81 values, got {len(grid)}")
+        for value in grid:
+            if type(value) is not int:
+                raise ValueError(f"expected integer values, got {value!r}")
+        return cls._from_values(grid, box_size)
+
+    @classmethod
+    def _from_values(cls, grid, box_size):
+        """Creates a puzzle from a new flat list of values of the right length."""
+        puzzle = cls(box_size=box_size)
+        puzzle.grid = grid
+        puzzle.update_options()
+        return puzzle
 
     def __str__(self):
         return_string = ''
-        for i in range(9):
-            return_string += str(self.sudoku[i])
+        size = self.size
+        for i in range(size):
+            return_string += str(self.grid[i * size:i * size + size])
             return_string += '\n'
         return return_string
 
+    @property
+    def sudoku(self):
+        """tuple of tuples of int: the values of the puzzle by row (9 x 9 for the default box
+        size), 0 for an empty cell. The rows are a read-only snapshot, so changing a value
+        through them fails instead of being lost; use place_value() or assign a new list of
+        lists of the same size, which rebuilds all options.
+        """
+        size = self.size
+        return tuple(tuple(self.grid[i * size:i * size + size]) for i in range(size))
+
+    @sudoku.setter
+    def sudoku(self, values):
+        size = self.size
+        self.grid = [values[i][j] for i in range(size) for j in range(size)]
+        self.update_options()
+
+    @property
+    def options(self):
+        """tuple of tuples of frozenset: the options still available in each cell of the
+        puzzle, a read-only snapshot of the candidate masks.
+        """
+        size = self.size
+        return tuple(tuple(frozenset(mask_to_values(self.candidates[i * size + j], size))
+                           for j in range(size))
+                     for i in range(size))
+
     def is_full(self):
         """checks if the Sudoku puzzle has non-zero entries in each cell
 
         Returns:
             boolean: True if all cells in the Sudoku puzzle have a non-zero entry
         """
-        for i in range(9):
-            for j in range(9):
-                if self.sudoku[i][j] == 0:
-                    return False
-        return True
+        return 0 not in self.grid
 
     def are_options_left(self):
         """checks if there are still valid options available for 1 or more cells in the
@@ -59,11 +541,7 @@ class Sudoku:
             boolean: True if there are still options available in at least 1 cell of the
             Sudoku puzzle.
         """
-        for i in range(9):
-            for j in range(9):
-                if len(self.options[i][j]) > 0:
-                    return True
-        return False
+        return any(self.candidates)
 
     def options_left(self):
         """Returns the sum of all options still left in the puzzle.
@@ -71,11 +549,8 @@ class Sudoku:
         Returns:
             int: number of options left in the puzzle
         """
-        options_total = 0
-        for i in range(9):
-            for j in range(9):
-                options_total += len(self.options[i][j])
-        return options_total
+        bit_count = self.tables.bit_count
+        return sum(bit_count[mask] for mask in self.candidates)
 
     def empty_cells_left(self):
         """Returns the number of empty cells in the puzzle.
@@ -83,13 +558,24 @@ class Sudoku:
         Returns:
             int: number of empty cells left in the puzzle
         """
-        empty_cells_total = 0
-        for i in range(9):
-            for j in range(9):
-                if self.sudoku[i][j] == 0:
-                    empty_cells_total += 1
-        return empty_cells_total
+        return self.grid.count(0)
 
+    def _is_unit_valid(self, indices):
+        """Checks that the cells with the given indices only hold values in range and that no
+        value occurs more than once.
+        """
+        seen = 0
+        size = self.size
+        for index in indices:
+            value = self.grid[index]
+            if value != 0:
+                if not 0 < value <= size:
+                    return False
+                bit = 1 << (value - 1)
+                if seen & bit:
+                    return False
+                seen |= bit
+        return True
 
     def is_cell_valid(self, cell):
         """checks if the value in the cell is valid, i.e. the same value is not
@@ -104,37 +590,11 @@ class Sudoku:
         Returns:
             boolean: returns False if the value in the cell is invalid
         """
-        if (self.sudoku[cell[0]][cell[1]]) == 0:
+        index = cell[0] * self.size + cell[1]
+        if self.grid[index] == 0:
             return True
-
-        # test row of the cell
-        reference_set = {1, 2, 3, 4, 5, 6, 7, 8, 9}
-        for j in range(9):
-            if self.sudoku[cell[0]][j] != 0:
-                if self.sudoku[cell[0]][j] not in reference_set:
-                    return False
-                reference_set.remove(self.sudoku[cell[0]][j])
-
-        # test column of the cell
-        reference_set = {1, 2, 3, 4, 5, 6, 7, 8, 9}
-        for i in range(9):
-            if self.sudoku[i][cell[1]] != 0:
-                if self.sudoku[i][cell[1]] not in reference_set:
-                    return False
-                reference_set.remove(self.sudoku[i][cell[1]])
-
-        # test quadrant of the cell
-        reference_set = {1, 2, 3, 4, 5, 6, 7, 8, 9}
-        quadrant = (cell[0]//3, cell[1]//3) # // is the floor division operator
-        for i in range(3):
-            for j in range(3):
-                row = quadrant[0]*3 + i
-                col = quadrant[1]*3 + j
-                if self.sudoku[row][col] != 0:
-                    if self.sudoku[row][col] not in reference_set:
-                        return False
-                    reference_set.remove(self.sudoku[row][col])
-        return True
+        units = self.tables.units
+        return all(self._is_unit_valid(units[unit]) for unit in self.tables.cell_units[index])
 
     def is_sudoku_valid(self):
         """Checks if the Sudoku puzzle is valid, i.e. does not have any invalid cell entries.
@@ -144,11 +604,7 @@ class Sudoku:
         Returns:
             boolean: True is the Sudoku puzzle has only valid or zero-value entries.
         """
-        for i in range(9):
-            for j in range(9):
-                if not self.is_cell_valid((i, j)):
-                    return False
-        return True
+        return all(self._is_unit_valid(unit) for unit in self.tables.units)
 
     def is_sudoku_solved(self):
         """Checks if the Sudoku puzzle is solved.
@@ -160,56 +616,243 @@ class Sudoku:
         return solved
 
     def update_options(self):
-        """Rewrites the options array,
+        """Rebuilds the used value masks of all rows, columns and boxes and the candidate masks
+        of all cells from the values in the puzzle.
+
+        Raises:
+            ValueError: if the puzzle has the wrong number of values, a value out of range or
+            a value that occurs twice in a row, column or box.
+        """
+        tables = self.tables
+        cells = len(self.grid)
+        if cells != tables.cells:
+            raise ValueError(f"Expected {tables.cells} values in the puzzle, got {cells}.")
+
+        # the puzzle is checked for duplicate values while the used value masks are built
+        size = tables.size
+        cell_box = tables.cell_box
+        row_used = [0] * size
+        col_used = [0] * size
+        box_used = [0] * size
+        for index, value in enumerate(self.grid):
+            if value != 0:
+                if not 0 < value <= size:
+                    raise ValueError(f"Value {value} out of range for a puzzle with values 1 "
+                                     f"to {size}.")
+                bit = 1 << (value - 1)
+                row = index // size
+                col = index % size
+                box = cell_box[index]
+                if (row_used[row] | col_used[col] | box_used[box]) & bit:
+                    raise ValueError("Can not update options if puzzle is not valid.")
+                row_used[row] |= bit
+                col_used[col] |= bit
+                box_used[box] |= bit
+
+        all_options = tables.all_options
+        candidates = [0] * tables.cells
+        for index, value in enumerate(self.grid):
+            if value == 0:
+                candidates[index] = all_options & ~(row_used[index // size]
+                                                    | col_used[index % size]
+                                                    | box_used[cell_box[index]])
+
+        self.row_used = row_used
+        self.col_used = col_used
+        self.box_used = box_used
+        self.candidates = candidates
+        self.update_counts()
+        # the rebuild can not be undone step by step
+        self.trail = []
+
+    def update_counts(self):
+        """Rebuilds the number of cells in every unit that still have a value as an option from
+        the candidate masks. update_options() does this already; call it after changing the
+        candidate masks directly.
+
+        value_counts[(value - 1) * 3 * size + unit] holds the count for a value and unit (see
+        BoardTables.units), and bit 'unit' of single_units[value - 1] is set when that count is
+        exactly 1, i.e. the value is a hidden single in the unit. Both are kept up to date by
+        every placement, option removal and undo.
         """
-        if not self.is_sudoku_valid():
-            raise Exception("Can not update options if puzzle is not valid.")
+        tables = self.tables
+        number_of_units = len(tables.units)
+        count_offsets = tables.count_offsets
+        cell_units = tables.cell_units
+        value_counts = [0] * (tables.size * number_of_units)
+        for index, mask in enumerate(self.candidates):
+            if mask:
+                row, col, box = cell_units[index]
+                for offset in count_offsets[mask]:
+                    value_counts[offset + row] += 1
+                    value_counts[offset + col] += 1
+                    value_counts[offset + box] += 1
+        single_units = [0] * tables.size
+        for slot, count in enumerate(value_counts):
+            if count == 1:
+                value, unit = divmod(slot, number_of_units)
+                single_units[value] |= 1 << unit
+        self.value_counts = value_counts
+        self.single_units = single_units
+        self.naked_queue = None
+
+    def _count_removed(self, index, removed):
+        """Updates the per unit value counts for options removed from a cell."""
+        value_counts = self.value_counts
+        single_units = self.single_units
+        tables = self.tables
+        units = tables.cell_units[index]
+        bit_value = tables.bit_value
+        number_of_units = len(tables.units)
+        while removed:
+            bit = removed & -removed
+            removed ^= bit
+            value = bit_value[bit] - 1
+            base = value * number_of_units
+            for unit in units:
+                count = value_counts[base + unit] - 1
+                value_counts[base + unit] = count
+                if count == 1:
+                    single_units[value] |= 1 << unit
+                elif count == 0:
+                    single_units[value] &= ~(1 << unit)
+
+    def _count_restored(self, index, restored):
+        """Updates the per unit value counts for options given back to a cell by undo()."""
+        value_counts = self.value_counts
+        single_units = self.single_units
+        tables = self.tables
+        units = tables.cell_units[index]
+        bit_value = tables.bit_value
+        number_of_units = len(tables.units)
+        while restored:
+            bit = restored & -restored
+            restored ^= bit
+            value = bit_value[bit] - 1
+            base = value * number_of_units
+            for unit in units:
+                count = value_counts[base + unit] + 1
+                value_counts[base + unit] = count
+                if count == 1:
+                    single_units[value] |= 1 << unit
+                elif count == 2:
+                    single_units[value] &= ~(1 << unit)
+
+    def _place(self, index, value):
+        """Places a value in an empty cell and removes it from the options of the 20 peers of the
+        cell only, instead of rebuilding all options.
 
-        # reset the options array
-        self.options = [[set([1,2,3,4,5,6,7,8,9]) for x in range(9)] for y in range(9)]
+        Args:
+            index (int): flat index (row * size + column) of the cell
+            value (int): the value to be placed in the cell
+
+        Raises:
+            Exception: in case the value is out of range or already used in the row, column or
+            box of the cell.
 
-        # first remove all options from cells that have non-zero value
-        for cell_row in range(9):
-            for cell_col in range (9):
-                value = self.sudoku[cell_row][cell_col]
-                if value != 0:
-                    self.options[cell_row][cell_col] = set()
+        Returns:
+            boolean: False if placing the value left one of the empty peers without options.
+        """
+        tables = self.tables
+        row, col = divmod(index, tables.size)
+        box = tables.cell_box[index]
+        if not 0 < value <= tables.size:
+            raise Exception("Illegal entry into Sudoku puzzle: "
+                            f"{value} at {(row, col)}.")
+        bit = 1 << (value - 1)
+        if (self.row_used[row] | self.col_used[col] | self.box_used[box]) & bit:
+            raise Exception("Illegal entry into Sudoku puzzle: "
+                            f"{value} at {(row, col)}.")
+        candidates = self.candidates
+        trail = self.trail
+        trail.append((index, candidates[index]))
+        trail.append((~index, value))
+        self.grid[index] = value
+        self._count_removed(index, candidates[index])
+        candidates[index] = 0
+        self.row_used[row] |= bit
+        self.col_used[col] |= bit
+        self.box_used[box] |= bit
+
+        value_counts = self.value_counts
+        cell_units = tables.cell_units
+        base = (value - 1) * len(tables.units)
+        singles = self.single_units[value - 1]
+        naked_queue = self.naked_queue
+        consistent = True
+        for peer in tables.peers[index]:
+            mask = candidates[peer]
+            if mask & bit:
+                trail.append((peer, mask))
+                rest = mask ^ bit
+                candidates[peer] = rest
+                if not rest & (rest - 1):
+                    if not rest:
+                        consistent = False
+                    elif naked_queue is not None:
+                        naked_queue.append(peer)
+                for unit in cell_units[peer]:
+                    count = value_counts[base + unit] - 1
+                    value_counts[base + unit] = count
+                    if count == 1:
+                        singles |= 1 << unit
+                    elif count == 0:
+                        singles &= ~(1 << unit)
+        self.single_units[value - 1] = singles
+        return consistent
+
+    def _eliminate(self, index, value):
+        """Removes a value from the options of a cell.
 
-        # loop through all the cells in puzzle
-        for cell_row in range(9):
-            for cell_col in range (9):
+        Returns:
+            boolean: False if the cell was left without options.
+        """
+        mask = self.candidates[index]
+        bit = 1 << (value - 1)
+        if mask & bit:
+            self.trail.append((index, mask))
+            rest = mask ^ bit
+            self.candidates[index] = rest
+            self._count_removed(index, bit)
+            if rest and not rest & (rest - 1) and self.naked_queue is not None:
+                self.naked_queue.append(index)
+            return mask != bit
+        return True
 
-                value = self.sudoku[cell_row][cell_col]
+    def undo(self, mark):
+        """Rolls back all placements and option removals recorded on the trail after the mark.
 
-                #remove value from options in the row if cell is empty
-                for j in range(9):
-                    if self.sudoku[cell_row][j] == 0:
-                        if value in self.options[cell_row][j]:
-                            self.options[cell_row][j].remove(value)
-
-                #remove value from options from column
-                for i in range(9):
-                    if self.sudoku[i][cell_col] == 0:
-                        if value in self.options[i][cell_col]:
-                            self.options[i][cell_col].remove(value)
-
-                #remove options from box
-                box = (cell_row//3, cell_col//3) # // is the floor division operator
-                for i in range(3):
-                    for j in range(3):
-                        row = box[0]*3 + i
-                        col = box[1]*3 + j
-                        test = (row != cell_row) & (col != cell_col)
-                        if test: # values in rows and columns have already been removed from options
-                            if self.sudoku[row][col] == 0:
-                                if value in self.options[row][col]:
-                                    self.options[row][col].remove(value)
+        Args:
+            mark (int): length of the trail at the point to return to, i.e. len(self.trail)
+            at that point
+        """
+        trail = self.trail
+        candidates = self.candidates
+        size = self.size
+        cell_box = self.tables.cell_box
+        if len(trail) > mark:
+            self.naked_queue = None
+        while len(trail) > mark:
+            index, previous = trail.pop()
+            if index >= 0:
+                self._count_restored(index, previous & ~candidates[index])
+                candidates[index] = previous
+            else:
+                index = ~index
+                bit = ~(1 << (previous - 1))
+                self.grid[index] = 0
+                self.row_used[index // size] &= bit
+                self.col_used[index % size] &= bit
+                self.box_used[cell_box[index]] &= bit
 
     def place_value(self, cell, value, inplace=True):
         """Method that places a value in a cell of the puzzle. After the value has been placed all
         options in the puzzle are updated as well. Method can be used to update the puzzle in-place
         or return a new puzzle. This different behaviour is necessary in the solve algorithm.
 
+        Placing a value in an empty cell only checks and updates the 20 peers of the cell.
+        Overwriting a non-zero value rebuilds all options of the puzzle.
+
         Placing a zero value has no effect and is ignored.
 
         Args:
@@ -220,6 +863,8 @@ class Sudoku:
 
         Raises:
             Exception: in case an illegal value is placed an exception is thrown.
+            ContradictionError: if the value leaves an empty peer of the cell without options.
+            The puzzle is left as it was.
 
         Returns:
             Sudoku: if inplace is False a new Sudoku object is returned. Otherwise a reference to
@@ -231,12 +876,29 @@ class Sudoku:
             return_sudoku = self
         else:
             return_sudoku = Sudoku(initial=self)
-        return_sudoku.sudoku[cell[0]][cell[1]] = value
-        return_sudoku.options[cell[0]][cell[1]] = set()
-        if not return_sudoku.is_sudoku_valid():
-            print(cell, type(value))
-            raise Exception ("Illegal entry into Sudoku puzzle.")
-        return_sudoku.update_options()
+        index = cell[0] * self.size + cell[1]
+        grid = return_sudoku.grid
+        if grid[index] == 0:
+            mark = len(return_sudoku.trail)
+            if not return_sudoku._place(index, value):
+                return_sudoku.undo(mark)
+                raise ContradictionError(f"Placing {value} at {tuple(cell)} leaves a cell "
+                                         "without options.")
+        else:
+            previous = grid[index]
+            grid[index] = value
+            if not return_sudoku.is_sudoku_valid():
+                grid[index] = previous
+                raise Exception("Illegal entry into Sudoku puzzle: "
+                                f"{value} at {tuple(cell)}.")
+            return_sudoku.update_options()
+            candidates = return_sudoku.candidates
+            if any(not grid[peer] and not candidates[peer]
+                   for peer in return_sudoku.tables.peers[index]):
+                grid[index] = previous
+                return_sudoku.update_options()
+                raise ContradictionError(f"Placing {value} at {tuple(cell)} leaves a cell "
+                                         "without options.")
 
         return return_sudoku
 
@@ -248,112 +910,128 @@ class Sudoku:
             int: number of trivial options in the Sudoku
         """
         number_of_naked_singles = 0
-        for i in range(9):
-            for j in range(9):
-                if len(self.options[i][j]) == 1:
-                    number_of_naked_singles += 1
+        bit_count = self.tables.bit_count
+        for mask in self.candidates:
+            if bit_count[mask] == 1:
+                number_of_naked_singles += 1
         return number_of_naked_singles
 
     def find_hidden_single(self):
         """Searches the puzzle for a hidden single, and returns the relevant information for the
         first find. Returns -1, -1, -1 in case no hidden single is found.
 
+        The hidden singles are read from the per unit value counts (see update_counts()), so
+        no units have to be scanned.
+
         Returns:
             int, int, int: row number, column number and value of the hidden single
         """
-
-        for checked_value in range(1,10):
-            # Check rows for a value that occurs only once in options
-            for cell_row in range(9):
-                counter = 0
-                hidden_single_column = 0
-                for cell_col in range(9):
-                    if checked_value in self.options[cell_row][cell_col]:
-                        counter += 1
-                        hidden_single_column = cell_col
-                if counter == 1:
-                    return cell_row, hidden_single_column, checked_value
-            # Check columns for a value that occurs once in options
-            for cell_col in range(9):
-                counter = 0
-                hidden_single_row = 0
-                for cell_row in range(9):
-                    if checked_value in self. options[cell_row][cell_col]:
-                        counter += 1
-                        hidden_single_row = cell_row
-                if counter == 1:
-                    return hidden_single_row, cell_col, checked_value
-            # Check boxes for a value that occurs once in options
-            for box_row in range(3):
-                for box_col in range(3):
-                    counter = 0
-                    hidden_single_row = 0
-                    hidden_single_col = 0
-                    for cell_rel_row in range(3):
-                        for cell_rel_col in range(3):
-                            cell_abs_row = box_row * 3 + cell_rel_row
-                            cell_abs_col = box_col * 3 + cell_rel_col
-                            if checked_value in self.options[cell_abs_row][cell_abs_col]:
-                                counter += 1
-                                hidden_single_row = cell_abs_row
-                                hidden_single_col = cell_abs_col
-                    if counter == 1:
-                        return hidden_single_row, hidden_single_col, checked_value
+        # The lowest value wins; for equal values rows are checked before columns and columns
+        # before boxes.
+        for value, units in enumerate(self.single_units):
+            if units:
+                bit = 1 << value
+                for index in self.tables.units[(units & -units).bit_length() - 1]:
+                    if self.candidates[index] & bit:
+                        row, col = divmod(index, self.size)
+                        return row, col, value + 1
         return -1, -1, -1
 
     def resolve_naked_and_hidden_singles(self):
         """Resolves all naked and hidden singles iteratively until no more naked and hidden
         singles are present in the puzzle.
-        """
 
-        finished = False
+        Returns:
+            boolean: False if a contradiction was found, i.e. an empty cell was left without
+            options.
+        """
 
-        while not finished:
+        while True:
+            if not self.resolve_naked_singles():
+                return False
             i_hidden, j_hidden, hidden_value = self.find_hidden_single()
             if i_hidden < 0:
-                self.resolve_naked_singles()
-                finished = True
-            else:
-                self.place_value((i_hidden, j_hidden), hidden_value, inplace=True)
-                self.resolve_naked_singles()
+                return True
+            self.stats.hidden_singles += 1
+            if not self._place(i_hidden * self.size + j_hidden, hidden_value):
+                return False
 
     def resolve_naked_singles(self):
         """Resolves all naked singles in the Sudoku puzzle. A naked single is
         where a cell has only a single option available.
 
         Returns:
-            Sudoku: a new Sudoku object in which all naked singles are resolved.
+            boolean: False if a contradiction was found, i.e. an empty cell was left without
+            options.
         """
-        #curr_sudoku = Sudoku(initial=self)
-
         # since resolving a trivial option can create new trivial options it is necessary
         # to loop until there are no more trivial options available.
+        # Only the cells that became singles since the last call are checked, see naked_queue;
+        # all cells are scanned when that is unknown. The order does not matter: placing a
+        # single can only turn other cells into singles or leave them without options, which
+        # _place() reports.
+        candidates = self.candidates
+        bit_value = self.tables.bit_value
+        while True:
+            singles = self.naked_queue
+            if singles is None:
+                singles = [index for index, mask in enumerate(candidates)
+                           if mask and not mask & (mask - 1)]
+            self.naked_queue = []
+            if not singles:
+                return True
+            for index in singles:
+                mask = candidates[index]
+                # the cell may have been filled as a hidden single in the meantime
+                if mask and not mask & (mask - 1):
+                    self.stats.naked_singles += 1
+                    if not self._place(index, bit_value[mask]):
+                        return False
 
-        while self.number_of_naked_singles() > 0:
-            for i in range(9):
-                for j in range(9):
-                    if len(self.options[i][j]) == 1:
-                        value = list(self.options[i][j])[0]
-                        self.place_value( (i,j), value, inplace=True)
+    def propagate(self, strategies=()):
+        """Resolves naked and hidden singles and applies the given strategies until none of
+        them makes progress. The strategies are tried in the given order; whenever one of them
+        removes options, the singles are resolved again before the next strategy is tried. How
+        often each strategy made progress is counted in stats.techniques.
 
-                        # if resolving a trivial option creates an invalid puzzle then there
-                        # must be a programming error that did not properly create the options
-                        # for each cell
-                        assert self.is_sudoku_valid(), "Impossible to resolve trivial \
-                            options. Resolving a trivial option resulted in an invalid Sudoku."
+        Args:
+            strategies (sequence of tuple, optional): (name, function) pairs of strategies from
+            strategies.STRATEGIES, looked up once by search(). Defaults to () (singles only).
 
-        return
+        Returns:
+            boolean: False if a contradiction was found, i.e. an empty cell was left without
+            options.
+        """
+        if not strategies:
+            return self.resolve_naked_and_hidden_singles()
+        techniques = self.stats.techniques
+        while True:
+            if not self.resolve_naked_and_hidden_singles():
+                return False
+            for name, strategy in strategies:
+                eliminations = strategy(self.candidates)
+                if eliminations:
+                    techniques[name] = techniques.get(name, 0) + 1
+                    for index, value in eliminations:
+                        if not self._eliminate(index, value):
+                            return False
+                    break
+            else:
+                return True
 
     def print_number_of_options(self):
         """Prints the available options for each cell.
         """
-        for i in range(9):
-            for j in range(9):
-                print(len(self.options[i][j]),end='')
+        size = self.size
+        for i in range(size):
+            for j in range(size):
+                print(self.tables.bit_count[self.candidates[i * size + j]],end='')
             print("\n")
 
     def read_sudoku_from_file(self, filename):
-        """Reads a Sudoku puzzle from a .csv file.
+        """Reads a Sudoku puzzle from a .csv file. All values are loaded at once and the options
+        are computed once afterwards. The file must have as many rows and values per row as the
+        size of the puzzle (9 for the default box size).
 
         Args:
             file (String): filename of file containing the Sudoku puzzle.
@@ -361,20 +1039,20 @@ class Sudoku:
         Raises:
             Exception: in case of errors in the input file.
         """
+        size = self.size
+        grid = [0] * self.tables.cells
         with open(filename, 'r') as file:
-            reader = csv.reader(file, delimiter = ' ')
             row_counter = 0
-            for row in reader:
-                # each row is a list
-                if len(row) != 9:
+            for line in file:
+                row = line.rstrip('\r\n').split(' ')
+                if len(row) != size:
                     raise Exception("Too long line in the input file - wrong file syntax.")
-                column_counter = 0
-                for next_value in row:
-                    self.place_value((row_counter, column_counter), int(next_value), inplace=True)
-                    column_counter += 1
-                row_counter += 1
-                if row_counter > 9:
+                if row_counter >= size:
                     raise Exception("Too many rows in the input file - wrong file syntax.")
+                grid[row_counter * size:row_counter * size + size] = [int(value) for value in row]
+                row_counter += 1
+        self.grid = grid
+        self.update_options()
 
     def select_next_move(self):
         """While solving the puzzle by exploring all options, a decision is needed about which
@@ -384,68 +1062,318 @@ class Sudoku:
         Returns:
             int, int, int: row number, column number and value selected for the next move
         """
+        tables = self.tables
+        bit_count = tables.bit_count
+        index_min = 0
+        minimum = tables.size + 1
+        for index, mask in enumerate(self.candidates):
+            num_of_options = bit_count[mask]
+            if 0 < num_of_options < minimum:
+                minimum = num_of_options
+                index_min = index
+        mask = self.candidates[index_min]
+        i_min, j_min = divmod(index_min, tables.size)
+        return i_min, j_min, tables.bit_value[mask & -mask]
+
+    def search(self, max_nodes=None, timeout=None, profile=False, on_node=None,
+               strategies=()):
+        """Iterative depth-first search with pro-active resolution of naked and hidden singles.
+        The search runs on this puzzle with an explicit stack of guesses instead of recursion,
+        so its depth is not limited by the Python recursion limit.
+
+        Every guess places the first option of the cell with the fewest options. When the guess
+        leads to a dead end it is undone, the option is removed from the cell and the search
+        continues from there.
+
+        This is a generator: each time the puzzle is solved it yields, with the solution in the
+        puzzle itself. When the search is exhausted the puzzle is rolled back to its initial
+        state. The work done is counted in a new SearchStats object in the attribute 'stats'.
+
+        Args:
+            max_nodes (int, optional): maximum number of guesses. Defaults to None (no limit).
+            timeout (float, optional): maximum number of seconds for the search. Defaults to
+            None (no limit).
+            profile (bool, optional): also measure the time spent in propagation, validity
+            checking and move selection. Defaults to False.
+            on_node (callable, optional): called before every guess as
+            on_node(puzzle, cell, value, depth), with depth the number of guesses already on
+            the stack. Defaults to None.
+            strategies (sequence of String, optional): strategies from strategies.py that are
+            applied after the singles, before guessing, see propagate(). Defaults to ()
+            (singles only).
+
+        Raises:
+            ValueError: if one of the strategies is unknown.
+            SearchLimitReached: when the search hits max_nodes or timeout. The puzzle is rolled
+            back to its initial state first.
+
+        Yields:
+            Sudoku: this puzzle, every time it holds a solution
+        """
+        if strategies:
+            from strategies import STRATEGIES
+            if self.size != 9:
+                raise ValueError("the strategies can only be used on 9 x 9 puzzles")
+            unknown = [name for name in strategies if name not in STRATEGIES]
+            if unknown:
+                raise ValueError(f"unknown strategies {unknown}, expected {list(STRATEGIES)}")
+            strategies = [(name, STRATEGIES[name]) for name in strategies]
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        root_mark = len(self.trail)
+        stack = []
+        stats = self.stats = SearchStats()
+        clock = time.perf_counter
+
+        # an empty cell without any options can never be filled
+        start = clock() if profile else 0.0
+        ok = all(value or mask for value, mask in zip(self.grid, self.candidates))
+        ok = ok and self.propagate(strategies)
+        if profile:
+            stats.propagation_time += clock() - start
+        while True:
+            if ok:
+                if profile:
+                    start = clock()
+                    full = self.is_full()
+                    stats.validity_time += clock() - start
+                else:
+                    full = self.is_full()
+                if full:
+                    yield self
+                    ok = False
+                    continue
+                stats.nodes += 1
+                if max_nodes is not None and stats.nodes > max_nodes:
+                    self.undo(root_mark)
+                    raise SearchLimitReached(f"node limit of {max_nodes} reached")
+                if deadline is not None and clock() > deadline:
+                    self.undo(root_mark)
+                    raise SearchLimitReached(f"timeout of {timeout} seconds reached")
+
+                if profile:
+                    start = clock()
+                    i_min, j_min, selected_value = self.select_next_move()
+                    stats.selection_time += clock() - start
+                else:
+                    i_min, j_min, selected_value = self.select_next_move()
+                if on_node is not None:
+                    on_node(self, (i_min, j_min), selected_value, len(stack))
+                index = i_min * self.size + j_min
+                stack.append((len(self.trail), index, selected_value))
+                if len(stack) > stats.max_depth:
+                    stats.max_depth = len(stack)
+                if profile:
+                    start = clock()
+                ok = (self._place(index, selected_value)
+                      and self.propagate(strategies))
+            elif stack:
+                mark, index, selected_value = stack.pop()
+                stats.backtracks += 1
+                if profile:
+                    start = clock()
+                self.undo(mark)
+                ok = (self._eliminate(index, selected_value)
+                      and self.propagate(strategies))
+            else:
+                self.undo(root_mark)
+                return
+            if profile:
+                stats.propagation_time += clock() - start
+
+    def solve(self, max_nodes=None, timeout=None, solver='backtrack', profile=False,
+              on_node=None, strategies=(), verbose=True):
+        """Method to solve the Sudoku puzzle. On success the solution is left in the puzzle
+        and printed.
+
+        The solver backend is selected with 'solver':
+
+        - 'backtrack': the iterative depth-first search of search() with pro-active
+          resolution of naked and hidden singles.
+        - 'dlx': Knuth's Algorithm X with Dancing Links (see dlx.py), which is fastest on
+          puzzles with few hints.
+        - 'naive': alternative_solve(), plain back tracking without any clean-up steps. This
+          backend prints in its own format and ignores max_nodes and timeout.
 
-        i_min = 0
-        j_min = 0
-        minimum = 10
-        for i in range(9):
-            for j in range(9):
-                num_of_options = len(self.options[i][j])
-                if num_of_options > 0:
-                    if num_of_options < minimum:
-                        minimum = num_of_options
-                        i_min = i
-                        j_min = j
-        selected_value = list(self.options[i_min][j_min])[0]
-        return i_min, j_min, selected_value
-
-    def solve(self):
-        """Method to solve the Sudoku puzzle. The algorithm used is a recursive depth-first
-        search algorithm with pro-active resolution of naked and hidden singles.
+        See find_solution() for solving without printing.
+
+        Args:
+            max_nodes (int, optional): maximum number of guesses. Defaults to None (no limit).
+            timeout (float, optional): maximum number of seconds for the search. Defaults to
+            None (no limit).
+            solver (String, optional): name of the solver backend, one of SOLVERS. Defaults
+            to 'backtrack'.
+            profile (bool, optional): measure phase timings, see search(). Only used by the
+            'backtrack' backend. Defaults to False.
+            on_node (callable, optional): per node callback, see search(). Only used by the
+            'backtrack' backend. Defaults to None.
+            strategies (sequence of String, optional): strategies applied before guessing, see
+            search(). Only used by the 'backtrack' backend. Defaults to () (singles only).
+            verbose (bool, optional): print the solution. Defaults to True.
+
+        Raises:
+            ValueError: if the solver backend is unknown.
+            SearchLimitReached: when the search hits max_nodes or timeout.
 
         Returns:
             Boolean: True if the puzzle is solved.
         """
-
-        if self.is_sudoku_solved():
-            print(self)
+        if solver == 'backtrack':
+            for _ in self.search(max_nodes=max_nodes, timeout=timeout, profile=profile,
+                                 on_node=on_node, strategies=strategies):
+                if verbose:
+                    print(self)
+                return True
+            return False
+        if solver == 'dlx':
+            from dlx import solve_exact_cover
+            solution = solve_exact_cover(self, max_nodes=max_nodes, timeout=timeout)
+            if solution is None:
+                return False
+            self.sudoku = solution
+            if verbose:
+                print(self)
             return True
-        else:
-            if self.are_options_left():
-                i_min, j_min, selected_value = self.select_next_move()
-                new_puzzle = self.place_value( (i_min, j_min), selected_value, inplace=False)
-                new_puzzle.resolve_naked_and_hidden_singles()
-                # if new_puzzle.empty_cells_left() > 10:
-                #     print(f"{new_puzzle.empty_cells_left()} {new_puzzle.options_left()}")
-                if not new_puzzle.solve():
-                    self.options[i_min][j_min].remove(selected_value)
-                    self.resolve_naked_and_hidden_singles()
-                    # if self.empty_cells_left() > 10:
-                    #     print(f"{self.empty_cells_left()} {self.options_left()}")
-                    if self.solve():
-                        return True
-                    else:
-                        return False
+        if solver == 'naive':
+            return self.alternative_solve(verbose=verbose)
+        raise ValueError(f"unknown solver '{solver}', expected one of {SOLVERS}")
+
+    def find_solution(self, max_nodes=None, timeout=None, solver='backtrack', strategies=()):
+        """Solves the puzzle like solve(), but without printing anything and without raising
+        SearchLimitReached: the outcome is returned as a SolveResult. On success the solution
+        is left in the puzzle.
+
+        Args:
+            max_nodes (int, optional): maximum number of guesses. Defaults to None (no limit).
+            timeout (float, optional): maximum number of seconds for the search. Defaults to
+            None (no limit).
+            solver (String, optional): name of the solver backend, one of SOLVERS. Defaults
+            to 'backtrack'.
+            strategies (sequence of String, optional): strategies applied before guessing, see
+            search(). Only used by the 'backtrack' backend. Defaults to () (singles only).
+
+        Raises:
+            ValueError: if the solver backend is unknown.
+
+        Returns:
+            SolveResult: the status, the solution and the stats of the search
+        """
+        if solver == 'naive':
+            self.stats = SearchStats()
+        try:
+            solved = self.solve(max_nodes=max_nodes, timeout=timeout, solver=solver,
+                                strategies=strategies, verbose=False)
+        except SearchLimitReached:
+            return SolveResult(LIMIT, None, self.stats)
+        if not solved:
+            return SolveResult(UNSOLVABLE, None, self.stats)
+        return SolveResult(SOLVED, bytes(self.grid).translate(_TO_LINE), self.stats)
+
+    def count_solutions(self, limit=None, max_nodes=None, timeout=None, strategies=()):
+        """Counts the solutions of the puzzle with the search of search(), without printing.
+        The search continues after each solution and stops as soon as the limit is reached.
+        The puzzle is left unchanged.
+
+        Args:
+            limit (int, optional): stop counting at this number of solutions. Defaults to None
+            (count all solutions).
+            max_nodes (int, optional): maximum number of guesses. Defaults to None (no limit).
+            timeout (float, optional): maximum number of seconds for the search. Defaults to
+            None (no limit).
+            strategies (sequence of String, optional): strategies applied before guessing, see
+            search(). Defaults to () (singles only).
+
+        Raises:
+            SearchLimitReached: when the search hits max_nodes or timeout.
+
+        Returns:
+            int: the number of solutions, at most limit
+        """
+        mark = len(self.trail)
+        count = 0
+        solutions = self.search(max_nodes=max_nodes, timeout=timeout, strategies=strategies)
+        try:
+            for _ in solutions:
+                count += 1
+                if limit is not None and count >= limit:
+                    break
+        finally:
+            solutions.close()
+            self.undo(mark)
+        return count
+
+    def iter_solutions(self, max_nodes=None, timeout=None, strategies=(), as_grid=False):
+        """Generator that yields the solutions of the puzzle one at a time, as the search finds
+        them. Only the state of the search is kept in memory, so the first few solutions of a
+        puzzle with millions of them are cheap: take them with itertools.islice() or stop
+        iterating. The puzzle is left unchanged once the generator is exhausted or closed; it
+        must not be changed while the generator is suspended.
+
+        Args:
+            max_nodes (int, optional): maximum number of guesses. Defaults to None (no limit).
+            timeout (float, optional): maximum number of seconds for the search. Defaults to
+            None (no limit).
+            strategies (sequence of String, optional): strategies applied before guessing, see
+            search(). Defaults to () (singles only).
+            as_grid (bool, optional): yield flat lists of values instead of lines. Defaults to
+            False.
+
+        Raises:
+            SearchLimitReached: when the search hits max_nodes or timeout.
+
+        Yields:
+            String or list of int: a copy of each solution, as a line (e.g. '534678912...') or
+            as a flat list of values
+        """
+        mark = len(self.trail)
+        solutions = self.search(max_nodes=max_nodes, timeout=timeout, strategies=strategies)
+        try:
+            for _ in solutions:
+                if as_grid:
+                    yield self.grid[:]
                 else:
-                    return True
-            else:
-                return False
+                    yield bytes(self.grid).translate(_TO_LINE).decode('ascii')
+        finally:
+            solutions.close()
+            self.undo(mark)
 
-    def alternative_solve(self):
+    def has_unique_solution(self, max_nodes=None, timeout=None):
+        """Checks if the puzzle is well-formed, i.e. has exactly one solution. The search stops
+        at the second solution. The puzzle is left unchanged.
+
+        Args:
+            max_nodes (int, optional): maximum number of guesses. Defaults to None (no limit).
+            timeout (float, optional): maximum number of seconds for the search. Defaults to
+            None (no limit).
+
+        Raises:
+            SearchLimitReached: when the search hits max_nodes or timeout.
+
+        Returns:
+            boolean: True if the puzzle has exactly one solution.
+        """
+        return self.count_solutions(limit=2, max_nodes=max_nodes, timeout=timeout) == 1
+
+    def alternative_solve(self, verbose=True):
         """This method is the one found in:
         https://github.com/techwithtim/Sudoku-GUI-Solver
         The method does not eliminate naked or hidden singles and therefore needs to run more
         iterations. The reduced overhead makes this method run faster on simpler puzzles but
         runs much longer (~60 times longer) on puzzles with the minimum number of hints (17)
 
+        Returns True if the puzzle was solved. The solution and the outcome are printed unless
+        'verbose' is False. Only 9 x 9 puzzles are supported.
+
         The parameter 'sudoku' used in the functions refers to a two-dimensional array of
         integers representing the sudoku puzzle.
         """
+        if self.size != 9:
+            raise ValueError("alternative_solve() can only solve 9 x 9 puzzles")
 
         def inner_solve(sudoku):
             find = inner_find_empty(sudoku)
             if not find:
-                inner_print_board(sudoku)
+                if verbose:
+                    inner_print_board(sudoku)
                 return True
             else:
                 row, col = find
@@ -496,7 +1424,12 @@ class Sudoku:
                         return (i, j)  # row, col
             return None
 
-        if not inner_solve(self.sudoku):
-            print("Unsolvable")
-        else:
+        sudoku = [list(row) for row in self.sudoku]
+        if not inner_solve(sudoku):
+            if verbose:
+                print("Unsolvable")
+            return False
+        self.sudoku = sudoku
+        if verbose:
             print("Solved")
+        return True
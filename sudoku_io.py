@@ -0,0 +1,190 @@
+"""Reading and writing Sudoku puzzles in the line format used by most puzzle collections: one
+puzzle per line as 81 characters, row by row, with '0' or '.' for an empty cell.
+
+Puzzles of other sizes are stored the same way, with 16 (4 x 4), 256 (16 x 16) or 625 (25 x 25)
+characters per line. The values above 9 are written as letters: A for 10, B for 11 and so on.
+
+Files are read as a stream, so collections of any size can be processed without holding them
+in memory. Files ending in '.gz' are (de)compressed on the fly and uncompressed files can be
+memory-mapped.
+"""
+
+import gzip
+import mmap
+import os
+import sys
+
+from sudoku import LINE_BOX_SIZES, SYMBOLS, Sudoku
+
+_DIGITS = set('0123456789.')
+
+# value by character, for puzzles larger than 9 x 9
+_VALUES = {'.': 0, '0': 0}
+for _value, _symbol in enumerate(SYMBOLS, 1):
+    _VALUES[_symbol] = _VALUES[_symbol.lower()] = _value
+
+
+def check_line(line):
+    """Checks the length and the characters of a puzzle line.
+
+    Args:
+        line (String): the puzzle
+
+    Raises:
+        ValueError: if the line does not have 81 digits and '.' characters (or 16, 256 or 625
+        characters for puzzles of other sizes, see the module docstring).
+
+    Returns:
+        String: the line, stripped of white space
+    """
+    line = line.strip()
+    box_size = LINE_BOX_SIZES.get(len(line))
+    if box_size is None:
+        raise ValueError(f"expected 81 characters, got {len(line)}")
+    if box_size == 3:
+        if not _DIGITS.issuperset(line):
+            raise ValueError("puzzle contains characters other than digits and '.'")
+    elif any(_VALUES.get(char, 99) > box_size * box_size for char in line):
+        raise ValueError(f"puzzle contains characters other than '.' and the values 1 to "
+                         f"{SYMBOLS[box_size * box_size - 1]}")
+    return line
+
+
+def parse_line(line):
+    """Creates a Sudoku puzzle from a line of 81 characters, '0' or '.' for an empty cell, see
+    Sudoku.from_string().
+
+    Args:
+        line (String): the puzzle
+
+    Raises:
+        ValueError: if the line is not a valid puzzle.
+
+    Returns:
+        Sudoku: the puzzle
+    """
+    return Sudoku.from_string(line)
+
+
+def format_line(puzzle, blank='.'):
+    """Returns a Sudoku puzzle as a line of 81 characters.
+
+    Args:
+        puzzle (Sudoku): the puzzle
+        blank (String, optional): character used for an empty cell. Defaults to '.'.
+
+    Returns:
+        String: the puzzle in line format, without a line end
+    """
+    return format_grid(puzzle.grid, blank)
+
+
+def format_grid(grid, blank='.'):
+    """Returns a flat list of values (e.g. a solution) as a line in line format.
+
+    Args:
+        grid (list of int): the values, 0 for an empty cell
+        blank (String, optional): character used for an empty cell. Defaults to '.'.
+
+    Returns:
+        String: the values in line format, without a line end
+    """
+    return ''.join(SYMBOLS[value - 1] if value else blank for value in grid)
+
+
+def iter_lines(file_name, use_mmap=False):
+    """Yields the puzzle lines of a file, skipping empty lines and comment lines starting with
+    '#'.
+
+    Args:
+        file_name (String): name of the file, '-' for standard input. Files ending in '.gz'
+        are decompressed while reading.
+        use_mmap (bool, optional): memory-map the file instead of reading it through a file
+        buffer. Not possible for standard input and gzip files. Defaults to False.
+
+    Raises:
+        ValueError: if use_mmap is requested for standard input or a gzip file.
+
+    Yields:
+        String: the puzzle lines, stripped of white space
+    """
+    if use_mmap:
+        if file_name == '-' or file_name.endswith('.gz'):
+            raise ValueError("only uncompressed files can be memory-mapped")
+        with open(file_name, 'rb') as file:
+            if os.fstat(file.fileno()).st_size == 0:  # an empty file can not be mapped
+                return
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                for raw_line in iter(mapped.readline, b''):
+                    line = raw_line.strip()
+                    if line and not line.startswith(b'#'):
+                        yield line.decode('ascii')
+        return
+
+    if file_name == '-':
+        file = sys.stdin
+    elif file_name.endswith('.gz'):
+        file = gzip.open(file_name, 'rt')
+    else:
+        file = open(file_name, 'r')
+    try:
+        for line in file:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                yield line
+    finally:
+        if file is not sys.stdin:
+            file.close()
+
+
+def read_puzzles(file_name, use_mmap=False, skip_invalid=False):
+    """Reads the puzzles of a line format file one at a time.
+
+    Args:
+        file_name (String): name of the file, see iter_lines()
+        use_mmap (bool, optional): memory-map the file, see iter_lines(). Defaults to False.
+        skip_invalid (bool, optional): silently skip lines that are not a valid puzzle instead
+        of raising a ValueError. Defaults to False.
+
+    Raises:
+        ValueError: for an invalid line, unless skip_invalid is set.
+
+    Yields:
+        Sudoku: the puzzles in the order of the file
+    """
+    for line_number, line in enumerate(iter_lines(file_name, use_mmap), start=1):
+        try:
+            yield parse_line(line)
+        except ValueError as exception:
+            if not skip_invalid:
+                raise ValueError(f"{file_name}, puzzle {line_number}: {exception}") from None
+
+
+def write_puzzles(file_name, puzzles, blank='.'):
+    """Writes puzzles to a file in line format, one puzzle per line.
+
+    Args:
+        file_name (String): name of the file, '-' for standard output. Files ending in '.gz'
+        are compressed while writing.
+        puzzles (iterable of Sudoku): the puzzles, consumed one at a time
+        blank (String, optional): character used for an empty cell. Defaults to '.'.
+
+    Returns:
+        int: number of puzzles written
+    """
+    if file_name == '-':
+        file = sys.stdout
+    elif file_name.endswith('.gz'):
+        file = gzip.open(file_name, 'wt')
+    else:
+        file = open(file_name, 'w')
+    count = 0
+    try:
+        for puzzle in puzzles:
+            file.write(format_line(puzzle, blank))
+            file.write('\n')
+            count += 1
+    finally:
+        if file is not sys.stdout:
+            file.close()
+    return count
@@ -0,0 +1,68 @@
+"""Checks of the batch solver: results in input order and recovery from crashed workers.
+
+Run with:
+    python -m unittest test_batch
+"""
+
+import glob
+import os
+import unittest
+
+import batch
+import sudoku
+from sudoku_io import format_grid
+
+DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+PUZZLE_FILES = sorted(glob.glob(os.path.join(DIRECTORY, 'sudoku_*.csv')))
+
+_solve_chunk = batch._solve_chunk
+
+
+def crashing_chunk(lines, *arguments):
+    """Stands in for batch._solve_chunk and kills the worker on a line starting with 'CRASH'."""
+    if any(line.startswith('CRASH') for line in lines):
+        os._exit(1)
+    return _solve_chunk(lines, *arguments)
+
+
+def puzzle_lines():
+    """Returns the bundled puzzles in line format, twice, with an invalid line in between."""
+    lines = [format_grid(sudoku.Sudoku(file_name=file_name).grid) for file_name in PUZZLE_FILES]
+    return lines + ['not a puzzle'] + lines
+
+
+class SolveManyTest(unittest.TestCase):
+
+    def test_input_order(self):
+        lines = puzzle_lines()
+        expected = list(batch.solve_many(lines, workers=1))
+        self.assertEqual([result.puzzle for result in expected], lines)
+        self.assertEqual(expected[len(PUZZLE_FILES)].status, batch.INVALID)
+        for chunk_size in (1, 3, 64):
+            with self.subTest(chunk_size=chunk_size):
+                results = list(batch.solve_many(lines, workers=2, chunk_size=chunk_size))
+                self.assertEqual(results, expected)
+
+    def test_crashed_worker(self):
+        lines = puzzle_lines()
+        expected = list(batch.solve_many(lines, workers=1))
+        batch._solve_chunk = crashing_chunk
+        try:
+            for crashes in ([10], [0, 1, 2], [3, len(lines) - 1]):
+                crashed = lines[:]
+                for position in crashes:
+                    crashed[position] = 'CRASH' + crashed[position]
+                with self.subTest(crashes=crashes):
+                    results = list(batch.solve_many(crashed, workers=2, chunk_size=3))
+                    self.assertEqual([result.puzzle for result in results], crashed)
+                    for position, (result, solved) in enumerate(zip(results, expected)):
+                        if position in crashes:
+                            self.assertEqual(result.status, batch.ERROR)
+                        else:
+                            self.assertEqual(result, solved)
+        finally:
+            batch._solve_chunk = _solve_chunk
+
+
+if __name__ == '__main__':
+    unittest.main()
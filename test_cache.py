@@ -0,0 +1,115 @@
+"""Checks of the canonical form of puzzles and of the solution cache.
+
+Run with:
+    python -m unittest test_cache
+"""
+
+import glob
+import os
+import random
+import tempfile
+import unittest
+
+import batch
+import cache
+import generator
+import sudoku
+from sudoku_io import format_grid
+from test_sudoku import pattern_grid
+
+DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+PUZZLE_FILES = sorted(glob.glob(os.path.join(DIRECTORY, 'sudoku_*.csv')))
+
+
+def sample_grids(rng):
+    """Returns the bundled puzzles, random puzzles of all densities and a few symmetric ones."""
+    grids = [sudoku.Sudoku(file_name=file_name).grid for file_name in PUZZLE_FILES]
+    for keep in (0.02, 0.2, 0.3, 0.5, 0.9, 1.0):
+        for _ in range(10):
+            solution = generator.random_grid(rng)
+            grids.append([value if rng.random() < keep else 0 for value in solution])
+    pattern = pattern_grid(3, rng)
+    grids += [pattern, pattern[:27] + [0] * 54, [5] + [0] * 80,
+              [value if index % 10 == 0 else 0 for index, value in enumerate(pattern)]]
+    return grids
+
+
+class CanonicalFormTest(unittest.TestCase):
+
+    def test_equivalent_puzzles_have_the_same_form(self):
+        rng = random.Random(13)
+        for number, grid in enumerate(sample_grids(rng)):
+            key, _ = cache.canonical_form(grid)
+            with self.subTest(puzzle=number):
+                for _ in range(3):
+                    variant = generator.random_variant(grid, rng)
+                    self.assertEqual(cache.canonical_form(variant)[0], key)
+
+    def test_restore(self):
+        rng = random.Random(14)
+        for number, grid in enumerate(sample_grids(rng)):
+            key, transformation = cache.canonical_form(grid)
+            with self.subTest(puzzle=number):
+                canonical = cache.transform(grid, transformation)
+                self.assertEqual(format_grid(canonical), key)
+                self.assertEqual(cache.restore(canonical, transformation), grid)
+
+    def test_inputs(self):
+        puzzle = sudoku.Sudoku(file_name=PUZZLE_FILES[0])
+        line = format_grid(puzzle.grid)
+        self.assertEqual(cache.canonical_form(puzzle), cache.canonical_form(line))
+        self.assertEqual(cache.canonical_form(puzzle.grid), cache.canonical_form(line))
+        for invalid in ('1' * 16, '1' * 81, [0] * 80 + [10]):
+            with self.assertRaises(ValueError):
+                cache.canonical_form(invalid)
+
+
+class SolutionCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        rng = random.Random(15)
+        self.puzzle = sudoku.Sudoku(file_name=os.path.join(DIRECTORY, 'sudoku_17.csv'))
+        self.variants = [format_grid(generator.random_variant(self.puzzle.grid, rng))
+                         for _ in range(5)]
+
+    def check_solution(self, line, result):
+        self.assertEqual(result.status, batch.SOLVED)
+        self.assertEqual(result.puzzle, line)
+        solved = sudoku.Sudoku.from_string(result.solution)
+        self.assertTrue(solved.is_sudoku_solved())
+        self.assertTrue(all(given in (0, value) for given, value
+                            in zip(sudoku.Sudoku.from_string(line).grid, solved.grid)))
+
+    def test_hits_on_equivalent_puzzles(self):
+        solutions = cache.SolutionCache()
+        self.check_solution(self.variants[0], solutions.solve(self.variants[0]))
+        self.assertEqual((solutions.hits, solutions.misses), (0, 1))
+        for line in self.variants:
+            self.check_solution(line, solutions.solve(line))
+        self.check_solution(self.variants[1], solutions.solve(self.variants[1]))
+        self.assertEqual((solutions.hits, solutions.misses), (6, 1))
+        self.assertEqual(len(solutions), 1)
+        self.assertEqual(solutions.solve('1' * 81).status, batch.INVALID)
+
+    def test_eviction(self):
+        solutions = cache.SolutionCache(maxsize=2)
+        lines = [format_grid(sudoku.Sudoku(file_name=file_name).grid)
+                 for file_name in PUZZLE_FILES if 'empty' not in file_name][:3]
+        for line in lines:
+            solutions.solve(line)
+        self.assertEqual(len(solutions), 2)
+        self.assertIsNone(solutions.get(lines[0]))
+        self.assertIsNotNone(solutions.get(lines[2]))
+
+    def test_store_on_disk(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, 'solutions')
+            with cache.SolutionCache(file_name=file_name) as solutions:
+                solutions.solve(self.variants[0])
+            with cache.SolutionCache(file_name=file_name) as solutions:
+                self.check_solution(self.variants[1], solutions.solve(self.variants[1]))
+                self.assertEqual((solutions.hits, solutions.misses), (1, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+"""Checks of the puzzle generator: unique and minimal puzzles, reproducible corpora.
+
+Run with:
+    python -m unittest test_generator
+"""
+
+import os
+import random
+import unittest
+
+import generator
+import sudoku
+
+DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
+
+class GeneratorTest(unittest.TestCase):
+
+    def check_puzzle(self, generated, symmetric=False):
+        puzzle = sudoku.Sudoku.from_string(generated.puzzle)
+        self.assertEqual(puzzle.count_solutions(limit=2), 1)
+        self.assertEqual(next(puzzle.iter_solutions()), generated.solution)
+        self.assertEqual(81 - puzzle.grid.count(0), generated.clues)
+        self.assertIn(generated.grade, generator.GRADES)
+        grid = puzzle.grid
+        if symmetric:
+            self.assertTrue(all(bool(grid[index]) == bool(grid[80 - index])
+                                for index in range(81)))
+        # minimal: removing any hint (or symmetric pair) gives more than one solution
+        for index in range(41 if symmetric else 81):
+            if grid[index]:
+                smaller = grid[:]
+                smaller[index] = smaller[80 - index if symmetric else index] = 0
+                self.assertEqual(sudoku.Sudoku.from_grid(smaller).count_solutions(limit=2), 2)
+
+    def test_unique_and_minimal(self):
+        for seed in range(3):
+            with self.subTest(seed=seed):
+                self.check_puzzle(generator.generate_puzzle(seed))
+
+    def test_symmetric(self):
+        self.check_puzzle(generator.generate_puzzle(0, symmetric=True), symmetric=True)
+
+    def test_reproducible(self):
+        self.assertEqual(generator.generate_puzzle('a:1'), generator.generate_puzzle('a:1'))
+        corpus = list(generator.generate_many(5, seed=7, chunk_size=2))
+        self.assertEqual([puzzle.seed for puzzle in corpus],
+                         [f"7:{number}" for number in range(5)])
+        self.assertEqual(list(generator.generate_many(5, seed=7, workers=2, chunk_size=2)),
+                         corpus)
+
+    def test_random_variant(self):
+        rng = random.Random(8)
+        solution = generator.random_grid(rng)
+        self.assertTrue(sudoku.Sudoku.from_grid(solution).is_sudoku_solved())
+        puzzle = sudoku.Sudoku(file_name=os.path.join(DIRECTORY, 'sudoku_17.csv'))
+        for _ in range(5):
+            variant = generator.random_variant(puzzle.grid, rng)
+            self.assertEqual(variant.count(0), puzzle.grid.count(0))
+            self.assertEqual(sudoku.Sudoku.from_grid(variant).count_solutions(limit=2), 1)
+
+    def test_rate(self):
+        solution = generator.random_grid(random.Random(9))
+        grade, stats = generator.rate([0] + solution[1:])
+        self.assertEqual(grade, 'easy')
+        self.assertEqual(stats.nodes, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
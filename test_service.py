@@ -0,0 +1,113 @@
+"""Checks of the asynchronous solving service: coalescing of identical requests, timeouts and
+cancellation. The solves run on a thread pool, so the tests can watch and block them.
+
+Run with:
+    python -m unittest test_service
+"""
+
+import asyncio
+import os
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import batch
+import service
+import sudoku
+from sudoku_io import format_line
+
+DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
+
+class SudokuServiceTest(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.puzzle = sudoku.Sudoku(file_name=os.path.join(DIRECTORY, 'sudoku_17.csv'))
+        self.line = format_line(self.puzzle)
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.service = service.SudokuService(executor=self.executor)
+        self.solved = []
+        self.release = threading.Event()
+
+        def counting_solve(key, *arguments):
+            self.solved.append(key)
+            return batch.solve_puzzle(key, *arguments)
+
+        self.solve_puzzle = service.solve_puzzle
+        service.solve_puzzle = counting_solve
+
+    def tearDown(self):
+        service.solve_puzzle = self.solve_puzzle
+        self.release.set()
+        self.service.close()
+        self.executor.shutdown()
+
+    def block_worker(self):
+        """Keeps the only worker busy until self.release is set."""
+        self.executor.submit(self.release.wait, 5)
+
+    async def test_solve(self):
+        result = await self.service.solve(self.puzzle)
+        self.assertEqual(result.status, batch.SOLVED)
+        self.assertEqual(result.puzzle, self.line)
+        self.assertEqual(result.solution, self.puzzle.find_solution().line)
+        invalid = await self.service.solve('1' * 81)
+        self.assertEqual(invalid.status, batch.INVALID)
+        self.assertEqual(self.service.pending, 0)
+
+    async def test_identical_requests_share_a_computation(self):
+        self.block_worker()
+        requests = [asyncio.ensure_future(self.service.solve(line))
+                    for line in (self.line, self.line.replace('.', '0'), self.line)]
+        await asyncio.sleep(0)
+        self.assertEqual(self.service.pending, 1)
+        self.release.set()
+        results = await asyncio.gather(*requests)
+        self.assertEqual(len(self.solved), 1)
+        self.assertEqual({result.status for result in results}, {batch.SOLVED})
+        self.assertEqual(results[1].puzzle, self.line.replace('.', '0'))
+        self.assertEqual(self.service.pending, 0)
+
+    async def test_timeout_while_waiting_for_a_worker(self):
+        self.block_worker()
+        result = await self.service.solve(self.line, timeout=0.05)
+        self.assertEqual(result.status, batch.LIMIT)
+        self.assertEqual(self.service.pending, 0)
+        await asyncio.sleep(0)  # lets the cancellation reach the queued work item
+        self.release.set()
+        result = await self.service.solve(self.line, timeout=2)
+        self.assertEqual(result.status, batch.SOLVED)
+        self.assertEqual(self.solved, [self.line])
+
+    async def test_request_after_cancellation_starts_a_new_computation(self):
+        self.block_worker()
+        first = asyncio.ensure_future(self.service.solve(self.line))
+        await asyncio.sleep(0)
+        first.cancel()
+        second = asyncio.ensure_future(self.service.solve(self.line, timeout=2))
+        with self.assertRaises(asyncio.CancelledError):
+            await first
+        self.release.set()
+        result = await second
+        self.assertEqual(result.status, batch.SOLVED)
+
+    async def test_cancelled_request_does_not_stop_the_others(self):
+        self.block_worker()
+        first = asyncio.ensure_future(self.service.solve(self.line))
+        second = asyncio.ensure_future(self.service.solve(self.line))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        self.release.set()
+        self.assertEqual((await second).status, batch.SOLVED)
+        with self.assertRaises(asyncio.CancelledError):
+            await first
+
+    async def test_closed(self):
+        self.service.close()
+        with self.assertRaises(RuntimeError):
+            await self.service.solve(self.line)
+
+
+if __name__ == '__main__':
+    unittest.main()
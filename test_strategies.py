@@ -0,0 +1,85 @@
+"""Checks that the logical strategies of strategies.py never remove an option that a solution
+needs, and that the solvers give the same results with and without them.
+
+Run with:
+    python -m unittest test_strategies
+"""
+
+import glob
+import itertools
+import os
+import random
+import unittest
+
+import sudoku
+from strategies import STRATEGIES
+from test_sudoku import pattern_grid, random_puzzle
+
+DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+PUZZLE_FILES = sorted(glob.glob(os.path.join(DIRECTORY, 'sudoku_*.csv')))
+
+
+def puzzles(number, seed):
+    """Returns the bundled puzzles and a number of random 9 x 9 puzzles, most of them with
+    several solutions.
+    """
+    rng = random.Random(seed)
+    result = [sudoku.Sudoku(file_name=file_name) for file_name in PUZZLE_FILES]
+    result += [random_puzzle(pattern_grid(3, rng), rng.uniform(0.2, 0.35), rng)
+               for _ in range(number)]
+    return result
+
+
+class StrategyTest(unittest.TestCase):
+
+    def solution_grids(self, puzzle, limit=50):
+        """Returns up to limit solutions of the puzzle as flat lists of values."""
+        return [sudoku.Sudoku.from_string(line).grid
+                for line in itertools.islice(puzzle.iter_solutions(), limit)]
+
+    def test_eliminations_are_sound(self):
+        found = dict.fromkeys(STRATEGIES, 0)
+        for number, puzzle in enumerate(puzzles(60, 10)):
+            if not puzzle.resolve_naked_and_hidden_singles():
+                continue
+            solutions = self.solution_grids(puzzle)
+            for name, strategy in STRATEGIES.items():
+                eliminations = strategy(puzzle.candidates[:])
+                found[name] += len(eliminations)
+                with self.subTest(puzzle=number, strategy=name):
+                    for index, value in eliminations:
+                        self.assertTrue(puzzle.candidates[index] >> (value - 1) & 1)
+                        self.assertFalse(any(grid[index] == value for grid in solutions))
+        # the puzzles are hard enough to exercise every strategy at least once
+        self.assertTrue(all(found.values()), found)
+
+    def test_propagate_keeps_all_solutions(self):
+        for number, puzzle in enumerate(puzzles(60, 11)):
+            solutions = self.solution_grids(puzzle)
+            mark = len(puzzle.trail)
+            before = puzzle.candidates[:]
+            with self.subTest(puzzle=number):
+                consistent = puzzle.propagate(list(STRATEGIES.items()))
+                if not consistent:
+                    self.assertEqual(solutions, [])
+                for grid in solutions:
+                    self.assertTrue(all(value == given or mask >> (value - 1) & 1
+                                        for value, given, mask
+                                        in zip(grid, puzzle.grid, puzzle.candidates)))
+                puzzle.undo(mark)
+                self.assertEqual(puzzle.candidates, before)
+
+    def test_count_solutions_with_strategies(self):
+        for number, puzzle in enumerate(puzzles(20, 12)):
+            with self.subTest(puzzle=number):
+                self.assertEqual(puzzle.count_solutions(limit=20, strategies=tuple(STRATEGIES)),
+                                 puzzle.count_solutions(limit=20))
+
+    def test_unknown_strategy(self):
+        puzzle = sudoku.Sudoku(file_name=PUZZLE_FILES[0])
+        with self.assertRaises(ValueError):
+            puzzle.count_solutions(strategies=['guessing'])
+
+
+if __name__ == '__main__':
+    unittest.main()
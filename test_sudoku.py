@@ -0,0 +1,192 @@
+"""Consistency checks of the solvers and of the incremental state of a puzzle (trail, per unit
+value counts, hidden single masks and naked single queue).
+
+Run with:
+    python -m unittest test_sudoku
+"""
+
+import glob
+import itertools
+import os
+import random
+import unittest
+
+import sudoku
+
+DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+PUZZLE_FILES = sorted(glob.glob(os.path.join(DIRECTORY, 'sudoku_*.csv')))
+
+
+def pattern_grid(box_size, rng):
+    """Returns a random complete grid for a box size, as a flat list of values."""
+    size = box_size * box_size
+    grid = [(box_size * (row % box_size) + row // box_size + col) % size + 1
+            for row in range(size) for col in range(size)]
+    labels = list(range(1, size + 1))
+    rng.shuffle(labels)
+    return [labels[value - 1] for value in grid]
+
+
+def random_puzzle(grid, keep, rng):
+    """Returns a puzzle made from a complete grid by keeping each value with a probability."""
+    return sudoku.Sudoku.from_grid([value if rng.random() < keep else 0 for value in grid])
+
+
+def state(puzzle):
+    """Returns a copy of everything the search changes and undo() has to restore."""
+    return (puzzle.grid[:], puzzle.candidates[:], puzzle.row_used[:], puzzle.col_used[:],
+            puzzle.box_used[:], puzzle.value_counts[:], puzzle.single_units[:])
+
+
+class SolverTest(unittest.TestCase):
+
+    def test_bundled_puzzles(self):
+        for file_name in PUZZLE_FILES:
+            with self.subTest(file_name=os.path.basename(file_name)):
+                puzzle = sudoku.Sudoku(file_name=file_name)
+                count = puzzle.count_solutions(limit=2)
+                solutions = []
+                for solver in ('backtrack', 'dlx'):
+                    result = sudoku.Sudoku(file_name=file_name).find_solution(solver=solver)
+                    self.assertEqual(result.status, sudoku.SOLVED if count else sudoku.UNSOLVABLE)
+                    if result.solution is not None:
+                        solved = sudoku.Sudoku.from_grid(result.grid)
+                        self.assertTrue(solved.is_sudoku_solved())
+                        self.assertTrue(all(given in (0, value) for given, value
+                                            in zip(puzzle.grid, result.grid)))
+                        solutions.append(result.solution)
+                if count == 1:
+                    self.assertEqual(solutions[0], solutions[1])
+
+    def test_iter_solutions_matches_count(self):
+        rng = random.Random(1)
+        grid = pattern_grid(3, rng)
+        for _ in range(5):
+            puzzle = random_puzzle(grid, 0.3, rng)
+            before = state(puzzle)
+            solutions = list(itertools.islice(puzzle.iter_solutions(), 50))
+            self.assertEqual(len(set(solutions)), len(solutions))
+            self.assertEqual(len(solutions), puzzle.count_solutions(limit=50))
+            self.assertEqual(state(puzzle), before)
+
+    def test_other_sizes(self):
+        rng = random.Random(2)
+        for box_size in (2, 4):
+            grid = pattern_grid(box_size, rng)
+            for solver in ('backtrack', 'dlx'):
+                puzzle = random_puzzle(grid, 0.6, rng)
+                result = puzzle.find_solution(solver=solver)
+                self.assertEqual(result.status, sudoku.SOLVED)
+                self.assertTrue(sudoku.Sudoku.from_grid(result.grid).is_sudoku_solved())
+
+    def test_read_only_snapshots(self):
+        puzzle = sudoku.Sudoku(file_name=os.path.join(DIRECTORY, 'sudoku_easy1.csv'))
+        before = state(puzzle)
+        with self.assertRaises(TypeError):
+            puzzle.sudoku[0][0] = 1
+        with self.assertRaises(AttributeError):
+            puzzle.options[0][0].remove(1)
+        self.assertEqual(state(puzzle), before)
+        puzzle.sudoku = [list(row) for row in puzzle.sudoku]
+        self.assertEqual(state(puzzle), before)
+
+    def test_invalid_input(self):
+        grid = [[0] * 9 for _ in range(9)]
+        for invalid in ([[0] * 10] * 8 + [[0]], grid[:8] + [[0] * 8], [0] * 80,
+                        [0] * 80 + [10], [0] * 80 + [1.0], [0] * 80 + ['1'], [0] * 80 + [True],
+                        [1] + [0] * 8 + [1] + [0] * 71):
+            with self.subTest(grid=invalid):
+                with self.assertRaises(ValueError):
+                    sudoku.Sudoku.from_grid(invalid)
+        for invalid in ('.' * 80, '.' * 80 + 'x', '.' * 80 + 'A', '11' + '.' * 79, ''):
+            with self.subTest(line=invalid):
+                with self.assertRaises(ValueError):
+                    sudoku.Sudoku.from_string(invalid)
+        self.assertEqual(sudoku.Sudoku.from_grid(grid).grid, [0] * 81)
+        self.assertEqual(sudoku.Sudoku.from_string('0' * 16).size, 4)
+
+
+class IncrementalStateTest(unittest.TestCase):
+
+    def check_search(self, puzzle, max_nodes, solutions=20):
+        """Searches a puzzle, checks the value counts at every node against a fresh count and
+        checks that undoing the search restores the puzzle.
+        """
+        def check_counts(current, cell, value, depth):
+            fresh = sudoku.Sudoku(initial=current)
+            fresh.update_counts()
+            self.assertEqual(current.value_counts, fresh.value_counts)
+            self.assertEqual(current.single_units, fresh.single_units)
+
+        before = state(puzzle)
+        mark = len(puzzle.trail)
+        search = puzzle.search(max_nodes=max_nodes, on_node=check_counts)
+        try:
+            for _ in itertools.islice(search, solutions):
+                self.assertTrue(puzzle.is_sudoku_solved())
+        except sudoku.SearchLimitReached:
+            pass
+        finally:
+            search.close()
+            puzzle.undo(mark)
+        self.assertEqual(state(puzzle), before)
+
+    def test_counts_9x9(self):
+        rng = random.Random(3)
+        for number in range(40):
+            puzzle = random_puzzle(pattern_grid(3, rng), rng.uniform(0.2, 0.4), rng)
+            with self.subTest(puzzle=number):
+                self.check_search(puzzle, max_nodes=500)
+
+    def test_counts_bundled(self):
+        for file_name in PUZZLE_FILES:
+            with self.subTest(file_name=os.path.basename(file_name)):
+                self.check_search(sudoku.Sudoku(file_name=file_name), max_nodes=500)
+
+    def test_counts_other_sizes(self):
+        rng = random.Random(4)
+        for box_size, keep in ((2, 0.2), (4, 0.5)):
+            for number in range(3):
+                puzzle = random_puzzle(pattern_grid(box_size, rng), keep, rng)
+                with self.subTest(box_size=box_size, puzzle=number):
+                    self.check_search(puzzle, max_nodes=100)
+
+    def test_counts_after_place_and_undo(self):
+        puzzle = sudoku.Sudoku(file_name=os.path.join(DIRECTORY, 'sudoku_17.csv'))
+        before = state(puzzle)
+        mark = len(puzzle.trail)
+        for index, mask in enumerate(puzzle.candidates):
+            if mask and not puzzle.grid[index]:
+                puzzle._place(index, sudoku.BIT_VALUE[mask & -mask])
+                break
+        fresh = sudoku.Sudoku(initial=puzzle)
+        fresh.update_counts()
+        self.assertEqual(puzzle.value_counts, fresh.value_counts)
+        puzzle.undo(mark)
+        self.assertEqual(state(puzzle), before)
+
+    def test_illegal_value_leaves_puzzle_unchanged(self):
+        puzzle = sudoku.Sudoku(file_name=os.path.join(DIRECTORY, 'sudoku_easy1.csv'))
+        before = state(puzzle)
+        row, col = divmod(puzzle.grid.index(0), 9)
+        with self.assertRaises(Exception):
+            puzzle.place_value((row, col), 10)
+        self.assertEqual(state(puzzle), before)
+
+    def test_contradiction_leaves_puzzle_unchanged(self):
+        grid = [0] * 81
+        grid[:8] = range(1, 9)
+        puzzle = sudoku.Sudoku.from_grid(grid)
+        before = state(puzzle)
+        with self.assertRaises(sudoku.ContradictionError):
+            puzzle.place_value((1, 8), 9)
+        self.assertEqual(state(puzzle), before)
+        puzzle.place_value((1, 8), 1)
+        with self.assertRaises(sudoku.ContradictionError):
+            puzzle.place_value((1, 8), 9)
+        self.assertEqual(puzzle.grid[17], 1)
+        self.assertEqual(puzzle.candidates[8], 1 << 8)
+
+
+if __name__ == '__main__':
+    unittest.main()
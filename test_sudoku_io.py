@@ -0,0 +1,70 @@
+"""Checks of reading and writing puzzle files in line format: plain, gzip compressed and
+memory-mapped.
+
+Run with:
+    python -m unittest test_sudoku_io
+"""
+
+import glob
+import os
+import tempfile
+import unittest
+
+import sudoku
+from sudoku_io import iter_lines, read_puzzles, write_puzzles
+
+DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+PUZZLE_FILES = sorted(glob.glob(os.path.join(DIRECTORY, 'sudoku_*.csv')))
+
+
+class LineFileTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.puzzles = [sudoku.Sudoku(file_name=file_name) for file_name in PUZZLE_FILES]
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.directory.name, name)
+
+    def test_round_trip(self):
+        for name, use_mmap in (('puzzles.txt', False), ('puzzles.txt', True),
+                               ('puzzles.txt.gz', False)):
+            with self.subTest(name=name, use_mmap=use_mmap):
+                self.assertEqual(write_puzzles(self.path(name), self.puzzles), len(self.puzzles))
+                puzzles = list(read_puzzles(self.path(name), use_mmap))
+                self.assertEqual([puzzle.grid for puzzle in puzzles],
+                                 [puzzle.grid for puzzle in self.puzzles])
+
+    def test_comments_and_blank_lines(self):
+        line = '.' * 81
+        with open(self.path('puzzles.txt'), 'w') as file:
+            file.write(f"# comment\n\n  {line}  \r\n#{line}\n{line}")
+        for use_mmap in (False, True):
+            with self.subTest(use_mmap=use_mmap):
+                self.assertEqual(list(iter_lines(self.path('puzzles.txt'), use_mmap)),
+                                 [line, line])
+
+    def test_empty_file(self):
+        for name, use_mmap in (('empty.txt', False), ('empty.txt', True),
+                               ('empty.txt.gz', False)):
+            with self.subTest(name=name, use_mmap=use_mmap):
+                write_puzzles(self.path(name), [])
+                self.assertEqual(list(iter_lines(self.path(name), use_mmap)), [])
+
+    def test_mmap_needs_a_plain_file(self):
+        with self.assertRaises(ValueError):
+            list(iter_lines(self.path('puzzles.txt.gz'), use_mmap=True))
+
+    def test_invalid_line(self):
+        with open(self.path('puzzles.txt'), 'w') as file:
+            file.write('.' * 81 + '\n' + '.' * 80 + '\n')
+        with self.assertRaises(ValueError):
+            list(read_puzzles(self.path('puzzles.txt')))
+        self.assertEqual(len(list(read_puzzles(self.path('puzzles.txt'), skip_invalid=True))), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+"""Checks the lockstep propagation of vectorized.py against the scalar solver.
+
+Run with:
+    python -m unittest test_vectorized
+"""
+
+import itertools
+import random
+import unittest
+
+import batch
+import sudoku
+from sudoku_io import format_grid
+from test_sudoku import pattern_grid
+
+try:
+    import vectorized
+except ImportError:  # NumPy is optional
+    vectorized = None
+
+
+def random_lines(number, rng):
+    """Returns random puzzle lines with unique, several and no solutions."""
+    lines = []
+    for _ in range(number):
+        grid = [value if rng.random() < rng.uniform(0.25, 0.6) else 0
+                for value in pattern_grid(3, rng)]
+        if rng.random() < 0.3:
+            # a clue changed to another legal value usually leaves no solution
+            index = rng.choice([index for index, value in enumerate(grid) if value])
+            grid[index] = 0
+            puzzle = sudoku.Sudoku.from_grid(grid)
+            options = sudoku.mask_to_values(puzzle.candidates[index])
+            grid[index] = rng.choice(sorted(options))
+        lines.append(format_grid(grid))
+    return lines
+
+
+@unittest.skipIf(vectorized is None, "NumPy is not installed")
+class LockstepTest(unittest.TestCase):
+
+    def test_propagate_keeps_all_solutions(self):
+        rng = random.Random(5)
+        lines = random_lines(200, rng)
+        candidates, invalid = vectorized.lines_to_candidates(lines)
+        dead = vectorized.propagate(candidates)
+        for row, line in enumerate(lines):
+            with self.subTest(line=line):
+                self.assertFalse(invalid[row])
+                puzzle = sudoku.Sudoku.from_string(line)
+                solutions = list(itertools.islice(puzzle.iter_solutions(), 20))
+                if dead[row]:
+                    self.assertEqual(solutions, [])
+                masks = candidates[row].tolist()
+                for solution in solutions:
+                    grid = sudoku.Sudoku.from_string(solution).grid
+                    self.assertTrue(all(mask >> (value - 1) & 1
+                                        for mask, value in zip(masks, grid)))
+
+    def test_solve_lines_matches_scalar(self):
+        rng = random.Random(6)
+        lines = random_lines(200, rng) + ['.' * 80, '11' + '.' * 79, '1' + '.' * 15]
+        for solver in ('backtrack', 'dlx'):
+            results = vectorized.solve_lines(lines, solver)
+            for line, result in zip(lines, results):
+                with self.subTest(solver=solver, line=line):
+                    expected = batch.solve_puzzle(line, solver)
+                    self.assertEqual(result.puzzle, line)
+                    self.assertEqual(result.status, expected.status)
+                    if result.status != batch.SOLVED:
+                        continue
+                    puzzle = sudoku.Sudoku.from_string(line)
+                    solved = sudoku.Sudoku.from_string(result.solution)
+                    self.assertTrue(solved.is_sudoku_solved())
+                    self.assertTrue(all(given in (0, value) for given, value
+                                        in zip(puzzle.grid, solved.grid)))
+                    if puzzle.count_solutions(limit=2) == 1:
+                        self.assertEqual(result.solution, expected.solution)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,171 @@
+"""Lockstep propagation of naked and hidden singles for many Sudoku puzzles at once, using NumPy.
+
+The candidates of N puzzles are stored in one uint16 array of shape (N, 81) with the same
+9-bit candidate masks as sudoku.py: bit v - 1 is set when value v is still an option for the
+cell. Naked and hidden singles are resolved for all puzzles together with bitwise operations
+over the rows, columns and boxes. Most puzzles are solved by singles alone; only the puzzles
+that are still open afterwards are handed to the regular solvers one by one.
+
+This module needs NumPy, which is not required by the rest of the package.
+"""
+
+import numpy as np
+
+import sudoku
+from batch import INVALID, SOLVED, UNSOLVABLE, PuzzleResult, solve_board, solve_puzzle
+from sudoku_io import check_line
+
+ALL_OPTIONS = np.uint16(0x1FF)
+
+# for every position within a unit the cells at that position in the 27 units (9 rows, 9
+# columns and 9 boxes), see sudoku.UNITS
+UNIT_POSITIONS = np.array(sudoku.UNITS).T.copy()
+
+# for every cell the numbers of its 3 units, see sudoku.CELL_UNITS
+CELL_UNITS = np.array(sudoku.CELL_UNITS).T.copy()
+
+# value by single bit candidate mask, 0 for the other masks, and single bit mask by value
+MASK_VALUES = np.zeros(0x200, dtype=np.uint8)
+MASK_VALUES[1 << np.arange(9)] = np.arange(1, 10)
+VALUE_MASKS = np.array([0] + [1 << value for value in range(9)], dtype=np.uint16)
+
+
+def _unit_masks(masks):
+    """Returns for every unit of every puzzle the values that occur in at least one cell and
+    those that occur in two or more cells, as two uint16 arrays of shape (N, 27).
+    """
+    once = np.zeros((len(masks), len(UNIT_POSITIONS[0])), dtype=np.uint16)
+    twice = np.zeros_like(once)
+    for cells in UNIT_POSITIONS:
+        mask = masks[:, cells]
+        twice |= once & mask
+        once |= mask
+    return once, twice
+
+
+def _per_cell(unit_masks):
+    """Combines the masks of the 3 units of every cell: (N, 27) -> (N, 81)."""
+    rows, columns, boxes = CELL_UNITS
+    return unit_masks[:, rows] | unit_masks[:, columns] | unit_masks[:, boxes]
+
+
+def lines_to_candidates(lines):
+    """Converts puzzles in line format into a candidate array.
+
+    Args:
+        lines (list of String): puzzles of 81 characters, '0' or '.' for an empty cell. The
+        lines must have been checked with sudoku_io.check_line().
+
+    Returns:
+        numpy.ndarray, numpy.ndarray: uint16 array of shape (N, 81) with the candidate masks
+        and boolean array of shape (N,) which is True for the puzzles with a value given twice
+        in a row, column or box
+    """
+    data = ''.join(lines).replace('.', '0').encode('ascii')
+    values = (np.frombuffer(data, dtype=np.uint8) - ord('0')).reshape(-1, 81)
+    given = VALUE_MASKS[values]
+    _, twice = _unit_masks(given)
+    invalid = (twice != 0).any(axis=1)
+    candidates = np.where(values > 0, given, ALL_OPTIONS).astype(np.uint16)
+    return candidates, invalid
+
+
+def propagate(candidates):
+    """Resolves naked and hidden singles in all puzzles, in place, until none of the puzzles
+    changes any more.
+
+    Args:
+        candidates (numpy.ndarray): uint16 array of shape (N, 81) with candidate masks
+
+    Returns:
+        numpy.ndarray: boolean array of shape (N,), True for the puzzles that ran into a
+        contradiction (a cell without options, a value without a cell in a unit or a value
+        fixed twice in a unit).
+    """
+    dead = np.zeros(len(candidates), dtype=bool)
+    active = np.arange(len(candidates))
+    while active.size:
+        before = candidates[active]
+
+        # naked singles: remove the value of every cell with a single option from its peers
+        fixed = np.where(before & (before - 1) == 0, before, 0).astype(np.uint16)
+        fixed_once, fixed_twice = _unit_masks(fixed)
+        cand = before & ~_per_cell(fixed_once) | fixed
+
+        # hidden singles: a value that is an option in only one cell of a unit; the masks of
+        # the units are taken before the naked singles, which only makes them more exact
+        once, twice = _unit_masks(before)
+        hidden = cand & _per_cell(once & ~twice)
+        cand = np.where(hidden != 0, hidden, cand)
+
+        failed = ((cand == 0).any(axis=1) | (fixed_twice != 0).any(axis=1)
+                  | (once != ALL_OPTIONS).any(axis=1))
+        changed = (cand != before).any(axis=1)
+        candidates[active] = cand
+        dead[active[failed]] = True
+        active = active[changed & ~failed]
+    return dead
+
+
+def _open_puzzle(masks):
+    """Creates a Sudoku puzzle from the candidate masks of one puzzle after propagation."""
+    puzzle = sudoku.Sudoku.from_grid(MASK_VALUES[masks].tolist())
+    for index, mask in enumerate(masks.tolist()):
+        puzzle.candidates[index] &= mask
+    puzzle.update_counts()
+    return puzzle
+
+
+def solve_lines(lines, solver='backtrack', max_nodes=None, timeout=None):
+    """Solves a list of puzzles by propagating singles in lockstep and searching only the
+    puzzles that are still open afterwards.
+
+    Args:
+        lines (list of String): puzzles as lines of 81 characters (or of another size, see
+        sudoku_io.py, which are not propagated in lockstep)
+        solver (String, optional): 'backtrack' or 'dlx', used for the open puzzles. Defaults
+        to 'backtrack'.
+        max_nodes (int, optional): node limit per open puzzle. Defaults to None (no limit).
+        timeout (float, optional): time limit in seconds per open puzzle. Defaults to None
+        (no limit).
+
+    Returns:
+        list of PuzzleResult: the outcome for each puzzle, in input order
+    """
+    results = [None] * len(lines)
+    positions = []
+    checked = []
+    for position, line in enumerate(lines):
+        try:
+            line = check_line(line)
+        except ValueError as exception:
+            results[position] = PuzzleResult(line, INVALID, None, str(exception))
+            continue
+        if len(line) == 81:
+            checked.append(line)
+            positions.append(position)
+        else:
+            # puzzles of other sizes are solved one by one
+            results[position] = solve_puzzle(lines[position], solver, max_nodes, timeout)
+    if not positions:
+        return results
+
+    candidates, invalid = lines_to_candidates(checked)
+    dead = propagate(candidates)
+    solutions = MASK_VALUES[candidates]
+    solved = (solutions != 0).all(axis=1) & ~dead
+    digits = (solutions + ord('0')).tobytes().decode('ascii')
+    for row, position in enumerate(positions):
+        line = lines[position]
+        if invalid[row]:
+            message = "Can not update options if puzzle is not valid."
+            results[position] = PuzzleResult(line, INVALID, None, message)
+        elif dead[row]:
+            results[position] = PuzzleResult(line, UNSOLVABLE, None, None)
+        elif solved[row]:
+            solution = digits[row * 81:row * 81 + 81]
+            results[position] = PuzzleResult(line, SOLVED, solution, None)
+        else:
+            results[position] = solve_board(line, _open_puzzle(candidates[row]), solver,
+                                            max_nodes, timeout)
+    return results